@@ -1,56 +1,296 @@
 import os
+import hmac
+import time
+import asyncio
+from collections import OrderedDict
+import httpx
+import jwt
 from supabase import create_client, Client
 from dotenv import load_dotenv
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from db import pool
+from cache import user_org_cache
 load_dotenv()
 
 url: str = os.environ.get("SUPABASE_URL")
 key: str = os.environ.get("SUPABASE_KEY")
 supabase: Client = create_client(url, key)
 
+# Optional: legacy HS256 projects sign tokens with the shared JWT secret instead of a published key
+SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
+
+# Supabase publishes the project's asymmetric signing keys here
+JWKS_URL = f"{url}/auth/v1/.well-known/jwks.json"
+JWKS_REFRESH_SECONDS = 600
+# Don't hammer the JWKS endpoint when tokens arrive with an unknown kid
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 30
+
+# Optional: shared secret for internal endpoints (worker metrics); unset disables them
+INTERNAL_API_TOKEN = os.environ.get("INTERNAL_API_TOKEN")
+
+# Maximum number of verified tokens kept in memory
+TOKEN_CACHE_SIZE = 1024
+
 # HTTPBearer security scheme for FastAPI
 security = HTTPBearer()
 
+_signing_keys: dict[str, jwt.PyJWK] = {}
+# When the JWKS was last requested, successfully or not
+_signing_keys_fetched_at = 0.0
+_signing_keys_lock = asyncio.Lock()
+_signing_keys_task: asyncio.Task | None = None
+
+# token -> {"exp": unix timestamp, "user": user dict}, least recently used first
+_token_cache: OrderedDict[str, dict] = OrderedDict()
+
+
+async def _fetch_signing_keys() -> None:
+    """
+    Fetch the project's JWKS from Supabase and replace the in-memory signing keys.
+    Keys that PyJWT can't load (unsupported kty/alg) are skipped. Callers hold _signing_keys_lock.
+    """
+    global _signing_keys, _signing_keys_fetched_at
+
+    # Counted even if the request fails, so an unreachable endpoint is also rate limited
+    _signing_keys_fetched_at = time.monotonic()
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        resp = await client.get(JWKS_URL)
+        resp.raise_for_status()
+
+    keys: dict[str, jwt.PyJWK] = {}
+    for jwk in resp.json().get("keys", []):
+        try:
+            keys[jwk.get("kid")] = jwt.PyJWK(jwk)
+        except jwt.PyJWTError:
+            continue
+
+    _signing_keys = keys
+
+
+async def refresh_signing_keys() -> None:
+    """Fetch the project's JWKS from Supabase and replace the in-memory signing keys."""
+    async with _signing_keys_lock:
+        await _fetch_signing_keys()
+
+
+async def _get_signing_key(kid: str | None) -> jwt.PyJWK | None:
+    """
+    The signing key for kid. An unknown kid triggers one JWKS refresh (the key may have
+    been rotated), at most every JWKS_MIN_REFRESH_INTERVAL_SECONDS; requests arriving
+    meanwhile wait for it instead of fetching again. Returns None if the key is still
+    unknown or the refresh failed, so the caller can fall back to Supabase.
+    """
+    signing_key = _signing_keys.get(kid)
+    if signing_key is not None:
+        return signing_key
+
+    async with _signing_keys_lock:
+        # Another request may have refreshed while this one waited for the lock
+        signing_key = _signing_keys.get(kid)
+        if signing_key is not None or time.monotonic() - _signing_keys_fetched_at <= JWKS_MIN_REFRESH_INTERVAL_SECONDS:
+            return signing_key
+        try:
+            await _fetch_signing_keys()
+        except Exception as e:
+            print(f"Error refreshing Supabase signing keys: {e}")
+            return None
+        return _signing_keys.get(kid)
+
+
+async def _refresh_signing_keys_forever() -> None:
+    while True:
+        try:
+            await refresh_signing_keys()
+        except Exception as e:
+            print(f"Error refreshing Supabase signing keys: {e}")
+        await asyncio.sleep(JWKS_REFRESH_SECONDS)
+
+
+def start_signing_key_refresh() -> None:
+    """Start the background task that keeps the JWKS cache warm (called from the app lifespan)."""
+    global _signing_keys_task
+    if _signing_keys_task is None or _signing_keys_task.done():
+        _signing_keys_task = asyncio.create_task(_refresh_signing_keys_forever())
+
+
+async def stop_signing_key_refresh() -> None:
+    """Cancel the background JWKS refresh task."""
+    global _signing_keys_task
+    if _signing_keys_task is not None:
+        _signing_keys_task.cancel()
+        try:
+            await _signing_keys_task
+        except asyncio.CancelledError:
+            pass
+        _signing_keys_task = None
+
+
+def _get_cached_user(token: str) -> dict | None:
+    entry = _token_cache.get(token)
+    if entry is None:
+        return None
+    if entry["exp"] <= time.time():
+        _token_cache.pop(token, None)
+        return None
+    _token_cache.move_to_end(token)
+    return entry["user"]
+
+
+def _cache_user(token: str, exp: float, user: dict) -> None:
+    _token_cache[token] = {"exp": exp, "user": user}
+    _token_cache.move_to_end(token)
+    while len(_token_cache) > TOKEN_CACHE_SIZE:
+        _token_cache.popitem(last=False)
+
+
+async def _verify_token_locally(token: str) -> dict | None:
+    """
+    Verify the token's signature, expiry and audience without calling Supabase.
+    Returns the claims, or None if there is no local key to verify it with.
+    Raises jwt.PyJWTError if the token is invalid.
+    """
+    header = jwt.get_unverified_header(token)
+    alg = header.get("alg")
+
+    if alg == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            return None
+        verification_key = SUPABASE_JWT_SECRET
+    else:
+        signing_key = await _get_signing_key(header.get("kid"))
+        if signing_key is None:
+            return None
+        verification_key = signing_key.key
+        alg = signing_key.algorithm_name
+
+    return jwt.decode(
+        token,
+        verification_key,
+        algorithms=[alg],
+        audience="authenticated",
+        options={"require": ["exp", "sub"]},
+    )
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> dict:
     """
     FastAPI dependency to authenticate user via Supabase JWT token.
-    Extracts Bearer token from Authorization header and verifies it with Supabase.
+    Extracts Bearer token from Authorization header and verifies it locally against
+    Supabase's signing keys, falling back to Supabase only when no local key is available.
     Returns the user data including user ID.
     """
     token = credentials.credentials
-    
+
+    cached_user = _get_cached_user(token)
+    if cached_user is not None:
+        return cached_user
+
     try:
-        # Verify the token with Supabase and get the user
-        response = supabase.auth.get_user(token)
-        user = response.user
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
+        claims = await _verify_token_locally(token)
+
+        if claims is not None:
+            user = {
+                "id": claims.get("sub"),
+                "email": claims.get("email"),
+                "user_metadata": claims.get("user_metadata"),
+            }
+            exp = claims["exp"]
+        else:
+            # No local key for this token: verify it with Supabase off the event loop
+            response = await asyncio.to_thread(supabase.auth.get_user, token)
+            remote_user = response.user
+
+            if not remote_user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid authentication credentials",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+
+            user = {
+                "id": remote_user.id,
+                "email": remote_user.email,
+                "user_metadata": remote_user.user_metadata,
+            }
+            exp = jwt.decode(token, options={"verify_signature": False}).get("exp", 0)
+
         # Ensure user has an ID (should always be present, but check for safety)
-        if not user.id:
+        if not user["id"]:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User ID not found in authentication token",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
-        return {
-            "id": user.id,
-            "email": user.email,
-            "user_metadata": user.user_metadata,
-        }
+
+        _cache_user(token, exp, user)
+
+        return user
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Could not validate credentials: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+async def get_current_org_id(
+    current_user: dict = Depends(get_current_user)
+) -> str:
+    """
+    FastAPI dependency that maps the authenticated user to their organization's id.
+    Served from user_org_cache after the first lookup (make_user fills it for new users).
+    Raises 404 if the user has no organization yet.
+    """
+    user_id = current_user['id']
+
+    org_id = user_org_cache.get(user_id)
+    if org_id is not None:
+        return org_id
+
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "SELECT org_id FROM profiles WHERE id = %s LIMIT 1",
+                    (user_id,)
+                )
+                row = await cur.fetchone()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching organization for this user: {str(e)}"
+        )
+
+    # Misses aren't cached, so a user is picked up as soon as make_user creates their org
+    if not row or not row[0]:
+        raise HTTPException(
+            status_code=404,
+            detail="No organization found for this user"
+        )
+
+    org_id = str(row[0])
+    user_org_cache.set(user_id, org_id)
+    return org_id
+
+
+async def require_internal_token(
+    x_internal_token: str | None = Header(default=None)
+) -> None:
+    """
+    FastAPI dependency for internal endpoints that expose data across orgs. Requires the
+    X-Internal-Token header to match INTERNAL_API_TOKEN; user tokens are not accepted.
+    Responds 404 when INTERNAL_API_TOKEN isn't set, so the endpoints don't exist at all.
+    """
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    if not x_internal_token or not hmac.compare_digest(x_internal_token.encode(), INTERNAL_API_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid internal token"
+        )
@@ -0,0 +1,68 @@
+# autumn_client.py
+import os
+import asyncio
+from autumn import Autumn
+from dotenv import load_dotenv
+load_dotenv()
+
+AUTUMN_SECRET_KEY = os.getenv("AUTUMN_SECRET_KEY")
+if not AUTUMN_SECRET_KEY:
+    raise RuntimeError("AUTUMN_SECRET_KEY is not set in .env")
+
+_client: Autumn | None = None
+
+# Request key -> the in-flight Autumn call that identical concurrent requests wait on
+_in_flight: dict[tuple, asyncio.Task] = {}
+
+
+def get_autumn_client() -> Autumn:
+    """The app-wide Autumn client, created on first use (its HTTP session is lazy too)."""
+    global _client
+    if _client is None:
+        _client = Autumn(token=AUTUMN_SECRET_KEY)
+    return _client
+
+
+async def close_autumn_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+async def coalesced(key: tuple, request):
+    """
+    Run request() unless an identical call (same key) is already in flight, in which
+    case wait for that one's result. Only for reads and other calls that are safe to share.
+    """
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(request())
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # Shielded so one caller going away doesn't cancel the call for everyone else
+    return await asyncio.shield(task)
+
+
+async def check(customer_id: str, feature_id: str):
+    """Autumn check, shared between concurrent callers for the same customer and feature."""
+    return await coalesced(
+        ("check", customer_id, feature_id),
+        lambda: get_autumn_client().check(customer_id=customer_id, feature_id=feature_id),
+    )
+
+
+async def checkout(**params):
+    """Autumn checkout; concurrent identical requests get the same checkout URL."""
+    return await coalesced(
+        ("checkout", tuple(sorted(params.items()))),
+        lambda: get_autumn_client().checkout(**params),
+    )
+
+
+async def get_billing_portal(**params):
+    """Autumn billing portal URL; concurrent identical requests share one call."""
+    return await coalesced(
+        ("billing_portal", tuple(sorted(params.items()))),
+        lambda: get_autumn_client().customers.get_billing_portal(**params),
+    )
@@ -0,0 +1,96 @@
+# bench_plate_matching.py
+"""
+Measure the fuzzy plate / VIN matcher on a synthetic lot. Needs no running database:
+plate_matching imports db, which only reads DATABASE_URL and never opens its pool here.
+
+    python bench_plate_matching.py              # 50,000 vehicles, 2,000 noisy lookups
+    python bench_plate_matching.py 200000 5000
+"""
+import os
+import sys
+import time
+import random
+import string
+import statistics
+
+# db.py reads this at import; nothing connects to it
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/bench")
+from routes.vapi_webhook.plate_matching import VehicleMatcher, decode_spoken  # noqa: E402
+
+# Typical mistakes a caller or the transcription makes when reading a plate
+CONFUSIONS = {"0": "O", "O": "0", "1": "I", "I": "1", "8": "B", "B": "8", "5": "S", "S": "5"}
+VIN_CHARS = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+
+
+def synthetic_lot(size: int, rng: random.Random) -> list[dict]:
+    vehicles = []
+    for i in range(size):
+        plate = "".join(rng.choices(string.ascii_uppercase, k=3)) + "".join(rng.choices(string.digits, k=rng.choice([3, 4])))
+        vin = "".join(rng.choices(VIN_CHARS, k=17))
+        vehicles.append({
+            "id": i,
+            "plate_normalized": plate,
+            "vin_normalized": vin,
+            "plate_number": plate,
+            "vin_number": vin,
+            "year": 2015,
+            "make": "Honda",
+            "model": "Civic",
+            "color": "Blue",
+        })
+    return vehicles
+
+
+def garble(plate: str, rng: random.Random) -> str:
+    """Apply one confusion, substitution, dropped character or swap."""
+    chars = list(plate)
+    i = rng.randrange(len(chars))
+    mistake = rng.choice(["confusion", "substitute", "drop", "swap"])
+    if mistake == "confusion" and chars[i] in CONFUSIONS:
+        chars[i] = CONFUSIONS[chars[i]]
+    elif mistake == "substitute":
+        chars[i] = rng.choice(string.ascii_uppercase + string.digits)
+    elif mistake == "drop":
+        del chars[i]
+    elif i + 1 < len(chars):
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+
+def percentile(samples: list[float], p: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main(argv: list[str]) -> int:
+    size = int(argv[0]) if argv else 50_000
+    lookups = int(argv[1]) if len(argv) > 1 else 2_000
+    rng = random.Random(0)
+
+    vehicles = synthetic_lot(size, rng)
+    start = time.perf_counter()
+    matcher = VehicleMatcher(vehicles)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    hits = 0
+    for _ in range(lookups):
+        target = rng.choice(vehicles)
+        query = decode_spoken(garble(target["plate_normalized"], rng))
+        start = time.perf_counter()
+        candidates = matcher.match(plate=query, limit=5)
+        timings.append((time.perf_counter() - start) * 1000)
+        if any(c["id"] == target["id"] for c in candidates):
+            hits += 1
+
+    print(f"vehicles       {size}")
+    print(f"build          {build_ms:.0f} ms")
+    print(f"lookups        {lookups}")
+    print(f"recall@5       {hits / lookups:.1%}")
+    print(f"p50            {statistics.median(timings):.3f} ms")
+    print(f"p99            {percentile(timings, 0.99):.3f} ms")
+    print(f"max            {max(timings):.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,104 @@
+# bench_vehicle_search.py
+"""
+Measure GET /vehicles/search on a synthetic lot. Needs DATABASE_URL (and the other
+settings in .env) pointing at a database with migrations applied; seeds a throwaway
+org, runs the searches through the route function and deletes the org afterwards.
+
+    python bench_vehicle_search.py              # 100,000 vehicles, 200 searches per case
+    python bench_vehicle_search.py 500000 50
+"""
+import os
+import sys
+import time
+import asyncio
+import statistics
+import importlib.util
+import psycopg
+from dotenv import load_dotenv
+load_dotenv()
+
+import db
+
+_spec = importlib.util.spec_from_file_location(
+    "search_vehicles", os.path.join(os.path.dirname(__file__), "routes", "vehicle_routes.py", "search_vehicles.py")
+)
+search_vehicles_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(search_vehicles_module)
+search_vehicles = search_vehicles_module.search_vehicles
+
+# (label, search parameters); every case asks for the first page of 10
+CASES = [
+    ("plate prefix", {"q": "A3F", "match": "prefix"}),
+    ("no match prefix", {"q": "QQ9", "match": "prefix"}),
+    ("VIN prefix", {"q": "1HG", "match": "prefix"}),
+    ("word prefix", {"q": "toy cam", "match": "prefix"}),
+    ("plate substring", {"q": "F-12", "match": "substring"}),
+    ("owner substring", {"q": "hernand", "match": "substring"}),
+    ("full text", {"q": "ford f-150 smith", "match": "fulltext"}),
+    ("make full text", {"q": "tesla", "match": "fulltext"}),
+    ("status + year filter", {"status": ["auction"], "year_min": 2015, "year_max": 2018}),
+    ("substring + status", {"q": "civic", "match": "substring", "status": ["on_lot"]}),
+]
+
+SEED_SQL = """
+    INSERT INTO vehicles (org_id, status, make, model, year, color, vin_number, plate_number,
+                          owner_first_name, owner_last_name, location)
+    SELECT %(org_id)s,
+           (ARRAY['on_lot', 'released', 'auction'])[1 + g %% 3],
+           (ARRAY['Honda', 'Toyota', 'Ford', 'Chevrolet', 'Nissan', 'Tesla'])[1 + (g * 7) %% 6],
+           (ARRAY['Civic', 'Camry', 'F-150', 'Silverado', 'Altima', 'Model 3'])[1 + (g * 7) %% 6],
+           2000 + g %% 25,
+           (ARRAY['Black', 'White', 'Silver', 'Blue', 'Red'])[1 + g %% 5],
+           (ARRAY['1HG', '4T1', '1FT', '1GC', '1N4', '5YJ'])[1 + (g * 7) %% 6] || upper(substr(md5(g::text), 1, 14)),
+           upper(substr(md5('p' || g), 1, 3)) || '-' || lpad((g %% 10000)::text, 4, '0'),
+           (ARRAY['Maria', 'James', 'Wei', 'Aisha', 'Carlos', 'Olga', 'John'])[1 + g %% 7],
+           (ARRAY['Hernandez', 'Smith', 'Nguyen', 'Okafor', 'Kowalski', 'Garcia', 'Brown'])[1 + (g / 7) %% 7],
+           'Lot ' || (1 + g %% 4)
+    FROM generate_series(1, %(size)s) g
+"""
+
+
+def percentile(samples: list[float], p: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p))]
+
+
+async def run(size: int, repeats: int) -> None:
+    with psycopg.connect(os.environ["DATABASE_URL"], autocommit=True) as conn:
+        org_id = conn.execute("INSERT INTO orgs (company_name) VALUES ('search benchmark') RETURNING id").fetchone()[0]
+        try:
+            start = time.perf_counter()
+            conn.execute(SEED_SQL, {"org_id": org_id, "size": size})
+            conn.execute("ANALYZE vehicles")
+            print(f"seeded {size} vehicles in {time.perf_counter() - start:.1f} s\n")
+
+            await db.open_pool()
+            try:
+                print(f"{'case':<24}{'matches':>9}{'p50 ms':>10}{'p99 ms':>10}")
+                for label, params in CASES:
+                    timings = []
+                    for _ in range(repeats):
+                        start = time.perf_counter()
+                        result = await search_vehicles(
+                            q=params.get("q"), match=params.get("match", "substring"),
+                            status=params.get("status"), year_min=params.get("year_min"),
+                            year_max=params.get("year_max"), location=None, cursor=None,
+                            page_size=10, org_id=str(org_id),
+                        )
+                        timings.append((time.perf_counter() - start) * 1000)
+                    print(f"{label:<24}{result['count']:>9}{statistics.median(timings):>10.2f}{percentile(timings, 0.99):>10.2f}")
+            finally:
+                await db.close_pool()
+        finally:
+            conn.execute("DELETE FROM vehicles WHERE org_id = %s", (org_id,))
+            conn.execute("DELETE FROM orgs WHERE id = %s", (org_id,))
+
+
+def main(argv: list[str]) -> int:
+    size = int(argv[0]) if argv else 100_000
+    repeats = int(argv[1]) if len(argv) > 1 else 200
+    asyncio.run(run(size, repeats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,93 @@
+# cache.py
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Small in-process cache bounded by size (least recently used entries are evicted first)
+    and by age (entries older than ttl seconds are treated as missing).
+    Only used from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def pop_where(self, predicate) -> int:
+        """Remove every entry for which predicate(key, value) is true. Returns how many were removed."""
+        keys = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Lot phone number -> the assistantOverrides.variableValues payload for assistant-request
+org_config_cache = TTLCache(maxsize=1024, ttl=300)
+
+# Vapi call.id -> org context for the live call. Removed on end-of-call-report; the TTL
+# only cleans up calls whose report never arrives. It holds which org the call belongs
+# to, not org data, so invalidate_org leaves it alone.
+call_session_cache = TTLCache(maxsize=4096, ttl=4 * 3600)
+
+# Supabase user id -> org_id, for the get_current_org_id dependency. The mapping only
+# changes in make_user, so org invalidation leaves it alone.
+user_org_cache = TTLCache(maxsize=10000, ttl=300)
+
+# org_id -> CompiledSchedule (weekly hours merged with exception dates) for the date tools
+org_schedule_cache = TTLCache(maxsize=1024, ttl=300)
+
+# org_id -> VehicleMatcher (fuzzy plate / VIN candidate set) for voice lookups
+vehicle_matcher_cache = TTLCache(maxsize=64, ttl=600)
+
+# Autumn customer id -> (fetched_at, subscription status) for /check-subscription. The TTL
+# is how long a stale status may still be served while a refresh runs; see get_subscription_status.
+entitlement_cache = TTLCache(maxsize=10000, ttl=3600)
+
+# org_id -> entitlement snapshot (last Autumn sync + unsynced ledger minutes) for the
+# assistant-request call gate. Not org data, so invalidate_org leaves it alone.
+entitlement_snapshot_cache = TTLCache(maxsize=4096, ttl=60)
+
+
+def invalidate_org(org_id) -> None:
+    """
+    Drop every cached entry that belongs to the given org so the next call reloads it.
+    Passing None drops everything (used after the invalidation listener reconnects).
+    """
+    if org_id is None:
+        org_config_cache.clear()
+        org_schedule_cache.clear()
+        vehicle_matcher_cache.clear()
+        return
+    org_id = str(org_id)
+    org_schedule_cache.pop(org_id)
+    vehicle_matcher_cache.pop(org_id)
+    org_config_cache.pop_where(lambda _, values: str(values.get("org_id")) == org_id)
@@ -1,15 +1,28 @@
 # db.py
 import os
-from psycopg_pool import ConnectionPool
+from psycopg_pool import AsyncConnectionPool
 from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.environ["DATABASE_URL"]  
 
-pool = ConnectionPool(
+# Opened and closed by the FastAPI lifespan in main.py so every route can
+# `async with pool.connection()` without blocking the event loop.
+pool = AsyncConnectionPool(
     conninfo=DATABASE_URL,
     # 👇 This disables prepared statements (fixes “prepared statement … does not exist” on transaction pooling)
     kwargs={"prepare_threshold": None},
     min_size=1,
     max_size=10,
-)
\ No newline at end of file
+    open=False,
+)
+
+
+async def open_pool():
+    """Open the shared pool and wait until the first connection is ready."""
+    await pool.open(wait=True)
+
+
+async def close_pool():
+    """Close the shared pool, returning all connections to the server."""
+    await pool.close()
\ No newline at end of file
@@ -0,0 +1,241 @@
+# entitlements.py
+import os
+import asyncio
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+import autumn_client
+from db import pool
+from cache import entitlement_snapshot_cache
+load_dotenv()
+
+AUTUMN_FEATURE_ID = os.getenv("AUTUMN_FEATURE_ID")
+
+RECONCILE_INTERVAL_SECONDS = 30
+# Orgs with calls since their last sync are re-checked this often, all others hourly
+ACTIVE_SYNC_SECONDS = 300
+IDLE_SYNC_SECONDS = 3600
+# A claim this old belongs to a worker that died or failed mid-sync
+CLAIM_TIMEOUT_SECONDS = 120
+MAX_SYNCS_PER_PASS = 50
+MAX_CONCURRENT_SYNCS = 5
+
+_reconciler_task: asyncio.Task | None = None
+
+
+async def load_snapshot(org_id: str) -> dict:
+    """
+    The org's entitlement as of its last Autumn sync, plus the ledger minutes Autumn's
+    balance doesn't include yet (untracked, or tracked after the sync). One query.
+    """
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("""
+                SELECT e.allowed, e.unlimited, e.overage_allowed, e.balance, e.next_reset_at, e.synced_at,
+                       (SELECT coalesce(sum(l.minutes), 0)
+                        FROM usage_ledger l
+                        WHERE l.org_id = e.org_id
+                          AND (l.tracked_at IS NULL OR l.tracked_at > e.synced_at))
+                FROM entitlements e
+                WHERE e.org_id = %s
+            """, (org_id,))
+            row = await cur.fetchone()
+
+    if row is None or row[5] is None:
+        return {"synced": False}
+    allowed, unlimited, overage_allowed, balance, next_reset_at, _, pending_minutes = row
+    return {
+        "synced": True,
+        "allowed": allowed,
+        "unlimited": unlimited,
+        "overage_allowed": overage_allowed,
+        "balance": float(balance) if balance is not None else None,
+        "next_reset_at": next_reset_at,
+        "pending_minutes": float(pending_minutes),
+    }
+
+
+def is_call_allowed(snapshot: dict, now: datetime | None = None) -> bool:
+    """
+    Whether a snapshot leaves the org minutes for another call. Orgs that haven't been
+    synced yet are let through: a caller is never turned away for lack of data.
+    """
+    if not snapshot["synced"] or snapshot["unlimited"] or snapshot["overage_allowed"]:
+        return True
+    now = now or datetime.now(timezone.utc)
+    if snapshot["next_reset_at"] is not None and now >= snapshot["next_reset_at"]:
+        # The balance has reset since the sync
+        return True
+    if snapshot["balance"] is None:
+        return bool(snapshot["allowed"])
+    return snapshot["balance"] - snapshot["pending_minutes"] > 0
+
+
+async def check_call_allowed(org_id) -> bool:
+    """
+    Gate for assistant-request. Served from entitlement_snapshot_cache, so repeat calls
+    for an org cost a dict lookup; a miss reads the snapshot and ledger in one query.
+    Never calls Autumn, and lets the call through if the database can't be read.
+    """
+    org_id = str(org_id)
+    snapshot = entitlement_snapshot_cache.get(org_id)
+    if snapshot is None:
+        try:
+            snapshot = await load_snapshot(org_id)
+        except Exception as e:
+            print(f"Error loading entitlement for org {org_id}: {e}")
+            return True
+        entitlement_snapshot_cache.set(org_id, snapshot)
+    return is_call_allowed(snapshot)
+
+
+async def record_usage(entries: list[tuple]) -> None:
+    """
+    Add finished calls to the ledger: (call_id, org_id, customer_id, minutes) tuples.
+    call_id is the key, so a call that is recorded twice only counts once.
+    """
+    if not entries:
+        return
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.executemany("""
+                INSERT INTO usage_ledger (call_id, org_id, customer_id, minutes)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (call_id) DO NOTHING
+            """, entries)
+        await conn.commit()
+    for org_id in {str(entry[1]) for entry in entries}:
+        entitlement_snapshot_cache.pop(org_id)
+
+
+async def mark_tracked(call_ids: list[str], tracked_at: datetime) -> None:
+    """Record that Autumn has accepted these calls' minutes."""
+    if not call_ids:
+        return
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("""
+                UPDATE usage_ledger SET tracked_at = %s
+                WHERE call_id = ANY(%s) AND tracked_at IS NULL
+            """, (tracked_at, call_ids))
+        await conn.commit()
+
+
+async def _claim_due_orgs() -> list[tuple]:
+    """
+    Claim the orgs whose entitlement is due for a sync, skipping rows another worker is
+    syncing. Returns (org_id, customer_id) pairs; the customer is the org's first profile.
+    """
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            # Every org with a lot number can take calls, so it needs a row
+            await cur.execute("""
+                INSERT INTO entitlements (org_id)
+                SELECT id FROM orgs WHERE phone_number IS NOT NULL
+                ON CONFLICT (org_id) DO NOTHING
+            """)
+            await cur.execute("""
+                UPDATE entitlements e
+                SET sync_claimed_at = now(),
+                    customer_id = (
+                        SELECT p.id FROM profiles p
+                        WHERE p.org_id = e.org_id
+                        ORDER BY p.created_at, p.id
+                        LIMIT 1
+                    )
+                WHERE e.org_id IN (
+                    SELECT d.org_id FROM entitlements d
+                    WHERE (d.sync_claimed_at IS NULL OR d.sync_claimed_at < now() - make_interval(secs => %s))
+                      AND (d.synced_at IS NULL
+                           OR d.synced_at < now() - make_interval(secs => %s)
+                           OR (d.synced_at < now() - make_interval(secs => %s)
+                               AND EXISTS (SELECT 1 FROM usage_ledger l
+                                           WHERE l.org_id = d.org_id
+                                             AND (l.tracked_at IS NULL OR l.tracked_at > d.synced_at))))
+                    ORDER BY d.synced_at NULLS FIRST
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING e.org_id, e.customer_id
+            """, (CLAIM_TIMEOUT_SECONDS, IDLE_SYNC_SECONDS, ACTIVE_SYNC_SECONDS, MAX_SYNCS_PER_PASS))
+            claimed = await cur.fetchall()
+        await conn.commit()
+    return claimed
+
+
+async def _sync_org(org_id, customer_id) -> None:
+    if customer_id is None:
+        # No profile yet; the claim expires and the org is tried again later
+        return
+    # Minutes tracked from here on may be missing from the balance Autumn returns
+    synced_at = datetime.now(timezone.utc)
+    response = await autumn_client.check(customer_id=str(customer_id), feature_id=AUTUMN_FEATURE_ID)
+    next_reset_at = getattr(response, 'next_reset_at', None)
+    if next_reset_at is not None:
+        # Autumn sends milliseconds since the epoch
+        next_reset_at = datetime.fromtimestamp(next_reset_at / 1000, timezone.utc)
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("""
+                UPDATE entitlements
+                SET allowed = %s, unlimited = %s, overage_allowed = %s, balance = %s,
+                    next_reset_at = %s, synced_at = %s, sync_claimed_at = NULL
+                WHERE org_id = %s
+            """, (
+                getattr(response, 'allowed', False),
+                getattr(response, 'unlimited', None),
+                getattr(response, 'overage_allowed', None),
+                getattr(response, 'balance', None),
+                next_reset_at,
+                synced_at,
+                org_id,
+            ))
+        await conn.commit()
+    entitlement_snapshot_cache.pop(str(org_id))
+
+
+async def reconcile_once() -> int:
+    """Sync every due org's entitlement with Autumn. Returns how many were synced."""
+    claimed = await _claim_due_orgs()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SYNCS)
+
+    async def sync(org_id, customer_id) -> bool:
+        async with semaphore:
+            try:
+                await _sync_org(org_id, customer_id)
+            except Exception as e:
+                print(f"Error syncing entitlement for org {org_id}: {e}")
+                return False
+            return customer_id is not None
+
+    results = await asyncio.gather(*(sync(org_id, customer_id) for org_id, customer_id in claimed))
+    return sum(results)
+
+
+async def _reconcile_forever() -> None:
+    while True:
+        try:
+            await reconcile_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Entitlement reconciler error: {e}")
+        await asyncio.sleep(RECONCILE_INTERVAL_SECONDS)
+
+
+def start_entitlement_reconciler() -> None:
+    """Start the background Autumn sync (called from the app lifespan)."""
+    global _reconciler_task
+    if _reconciler_task is None or _reconciler_task.done():
+        _reconciler_task = asyncio.create_task(_reconcile_forever())
+
+
+async def stop_entitlement_reconciler() -> None:
+    global _reconciler_task
+    if _reconciler_task is not None:
+        _reconciler_task.cancel()
+        try:
+            await _reconciler_task
+        except asyncio.CancelledError:
+            pass
+        _reconciler_task = None
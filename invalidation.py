@@ -0,0 +1,64 @@
+# invalidation.py
+import os
+import asyncio
+import psycopg
+from dotenv import load_dotenv
+from cache import invalidate_org
+load_dotenv()
+
+# LISTEN needs a session-level connection, so when DATABASE_URL points at a transaction
+# pooler (e.g. Supabase on port 6543) set DATABASE_LISTEN_URL to the direct/session port.
+DATABASE_LISTEN_URL = os.getenv("DATABASE_LISTEN_URL") or os.environ["DATABASE_URL"]
+
+# Payload is the org id whose orgs / exception_dates / vehicles rows changed
+CHANNEL = "org_invalidation"
+
+RECONNECT_MAX_SECONDS = 30
+
+_listener_task: asyncio.Task | None = None
+
+
+async def notify_org_changed(cur, org_id) -> None:
+    """
+    Queue an invalidation for org_id on the current transaction.
+    Postgres only delivers it on commit, so rolled back writes never evict anything.
+    """
+    await cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, str(org_id)))
+
+
+async def _listen_forever() -> None:
+    delay = 1
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(DATABASE_LISTEN_URL, autocommit=True) as conn:
+                await conn.execute(f"LISTEN {CHANNEL}")
+                # Anything written while we were disconnected was missed, so start from a clean cache
+                invalidate_org(None)
+                delay = 1
+                async for notify in conn.notifies():
+                    invalidate_org(notify.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Invalidation listener disconnected: {e}")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+
+def start_invalidation_listener() -> None:
+    """Start this worker's LISTEN task (called from the app lifespan)."""
+    global _listener_task
+    if _listener_task is None or _listener_task.done():
+        _listener_task = asyncio.create_task(_listen_forever())
+
+
+async def stop_invalidation_listener() -> None:
+    """Cancel the LISTEN task and close its connection."""
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
@@ -1,11 +1,44 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from routers import routers
+from db import open_pool, close_pool
+from auth import start_signing_key_refresh, stop_signing_key_refresh
+from invalidation import start_invalidation_listener, stop_invalidation_listener
+from usage_metering import start_usage_metering, stop_usage_metering
+from vapi_client import close_vapi_client
+from autumn_client import close_autumn_client
+from entitlements import start_entitlement_reconciler, stop_entitlement_reconciler
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the async Postgres pool before serving and close it on shutdown
+    await open_pool()
+    # Keep Supabase's JWT signing keys cached so auth doesn't need a network call
+    start_signing_key_refresh()
+    # Evict this worker's caches when another worker writes to an org
+    start_invalidation_listener()
+    # Track call minutes in Autumn off the webhook path
+    start_usage_metering()
+    # Keep the call gate's entitlement snapshots in line with Autumn
+    start_entitlement_reconciler()
+    try:
+        yield
+    finally:
+        await close_vapi_client()
+        await stop_usage_metering()
+        await stop_entitlement_reconciler()
+        await close_autumn_client()
+        await stop_invalidation_listener()
+        await stop_signing_key_refresh()
+        await close_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 
@@ -0,0 +1,204 @@
+# migrate.py
+"""
+Apply the SQL files in migrations/ in order and record them in schema_migrations.
+
+    python migrate.py                 # apply pending migrations
+    python migrate.py --list          # show applied / pending migrations
+    python migrate.py --check-plans   # exit 1 if a hot query doesn't use its index (see tests/test_query_plans.py)
+"""
+import os
+import sys
+import json
+import uuid
+from pathlib import Path
+import psycopg
+from dotenv import load_dotenv
+load_dotenv()
+
+# Migrations need a session-level connection (advisory lock), same as the LISTEN connection
+DATABASE_URL = os.getenv("DATABASE_LISTEN_URL") or os.environ["DATABASE_URL"]
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+# Arbitrary constant so two deploys can't apply migrations at the same time
+MIGRATION_LOCK_ID = 72_001_001
+
+_ID = uuid.UUID(int=1)
+
+# The queries the call and dashboard hot paths depend on: representative parameters and
+# the indexes the plan must use (a tuple lists interchangeable indexes). Naming the index
+# matters: with sequential scans off, any index on org_id can serve these queries and the
+# check would pass without the right one.
+HOT_QUERIES = {
+    "orgs by phone_number": (
+        "SELECT id FROM orgs WHERE phone_number = %s LIMIT 1",
+        ("+15550000000",),
+        ["orgs_phone_number_key"],
+    ),
+    "profiles by org_id": (
+        "SELECT id FROM profiles WHERE org_id = %s",
+        (_ID,),
+        ["profiles_org_id_idx"],
+    ),
+    "vehicles by org_id, vin_normalized": (
+        "SELECT id, status FROM vehicles WHERE org_id = %s AND vin_normalized = %s LIMIT 2",
+        (_ID, "1HGCM82633A004352"),
+        # The text_pattern_ops prefix index from GET /vehicles/search serves equality too
+        [("vehicles_org_id_vin_normalized_idx", "vehicles_org_id_vin_normalized_prefix_idx")],
+    ),
+    "vehicles by org_id, plate_normalized": (
+        "SELECT id, status FROM vehicles WHERE org_id = %s AND plate_normalized = %s LIMIT 2",
+        (_ID, "ABC123"),
+        [("vehicles_org_id_plate_normalized_idx", "vehicles_org_id_plate_normalized_prefix_idx")],
+    ),
+    "vehicles by org_id, last 4 of VIN": (
+        "SELECT id, status FROM vehicles WHERE org_id = %s AND right(vin_normalized, 4) = %s LIMIT 2",
+        (_ID, "4352"),
+        ["vehicles_org_id_vin_last4_idx"],
+    ),
+    "vehicles page by org_id": (
+        """
+        SELECT id FROM vehicles
+        WHERE org_id = %s AND (created_at, id) < (now(), %s)
+        ORDER BY created_at DESC, id DESC
+        LIMIT 11
+        """,
+        (_ID, _ID),
+        ["vehicles_org_id_created_at_id_idx"],
+    ),
+    # load_org_schedule (check_date_open / check_open_now)
+    "org schedule by org_id": (
+        """
+        SELECT o.default_hours_of_operation,
+               o.time_zone,
+               coalesce(array_agg(ARRAY[e.date, e.hours]) FILTER (WHERE e.id IS NOT NULL), '{}')
+        FROM orgs o
+        LEFT JOIN exception_dates e ON e.org_id = o.id
+        WHERE o.id = %s
+        GROUP BY o.id
+        """,
+        (_ID,),
+        ["orgs_pkey", "exception_dates_org_id_date_idx"],
+    ),
+    "addresses by org_id": (
+        "SELECT id, address FROM addresses WHERE org_id = %s",
+        (_ID,),
+        ["addresses_org_id_idx"],
+    ),
+    "entitlement snapshot by org_id": (
+        """
+        SELECT e.balance,
+               (SELECT coalesce(sum(l.minutes), 0) FROM usage_ledger l
+                WHERE l.org_id = e.org_id AND (l.tracked_at IS NULL OR l.tracked_at > e.synced_at))
+        FROM entitlements e
+        WHERE e.org_id = %s
+        """,
+        (_ID,),
+        ["entitlements_pkey", "usage_ledger_org_id_tracked_at_idx"],
+    ),
+}
+
+
+def _migration_files() -> list[Path]:
+    return sorted(MIGRATIONS_DIR.glob("*.sql"))
+
+
+def _ensure_migrations_table(conn: psycopg.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version TEXT PRIMARY KEY,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+
+
+def _applied_versions(conn: psycopg.Connection) -> set[str]:
+    return {row[0] for row in conn.execute("SELECT version FROM schema_migrations").fetchall()}
+
+
+def apply_migrations(conn: psycopg.Connection) -> list[str]:
+    """Apply every pending migration, each in its own transaction. Returns the versions applied."""
+    applied_now = []
+    conn.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+    try:
+        _ensure_migrations_table(conn)
+        applied = _applied_versions(conn)
+        for path in _migration_files():
+            version = path.stem
+            if version in applied:
+                continue
+            with conn.transaction():
+                conn.execute(path.read_text())
+                conn.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+            applied_now.append(version)
+            print(f"Applied {version}")
+    finally:
+        conn.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+    return applied_now
+
+
+def _scans(plan: dict) -> tuple[list[str], set[str]]:
+    """Tables read by sequential scan and indexes used anywhere in the plan."""
+    seq_scans, indexes = [], set()
+    if plan.get("Node Type") == "Seq Scan":
+        seq_scans.append(plan.get("Relation Name"))
+    if plan.get("Index Name"):
+        indexes.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        child_seq_scans, child_indexes = _scans(child)
+        seq_scans.extend(child_seq_scans)
+        indexes |= child_indexes
+    return seq_scans, indexes
+
+
+def check_plans(conn: psycopg.Connection) -> list[str]:
+    """
+    EXPLAIN every hot query with sequential scans disabled and check that the planner uses
+    the query's own indexes. Returns a description of each failing query.
+    The planner needs statistics to tell the indexes apart, so run it against a database
+    that has data (and has been analyzed), not an empty schema.
+    """
+    failures = []
+    with conn.transaction(force_rollback=True):
+        conn.execute("SET LOCAL enable_seqscan = off")
+        for name, (query, params, expected_indexes) in HOT_QUERIES.items():
+            row = conn.execute(f"EXPLAIN (FORMAT JSON) {query}", params).fetchone()
+            plan = row[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            seq_scans, indexes = _scans(plan[0]["Plan"])
+            if seq_scans:
+                failures.append(f"{name}: sequential scan on {', '.join(seq_scans)}")
+            for expected in expected_indexes:
+                alternatives = expected if isinstance(expected, tuple) else (expected,)
+                if not indexes.intersection(alternatives):
+                    failures.append(
+                        f"{name}: doesn't use {' or '.join(alternatives)} (uses {', '.join(sorted(indexes)) or 'no index'})"
+                    )
+    return failures
+
+
+def main(argv: list[str]) -> int:
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        if "--list" in argv:
+            _ensure_migrations_table(conn)
+            applied = _applied_versions(conn)
+            for path in _migration_files():
+                print(f"{'applied' if path.stem in applied else 'pending'}  {path.stem}")
+            return 0
+
+        if "--check-plans" in argv:
+            failures = check_plans(conn)
+            for failure in failures:
+                print(f"FAIL {failure}")
+            if not failures:
+                print(f"OK {len(HOT_QUERIES)} hot queries use their indexes")
+            return 1 if failures else 0
+
+        if not apply_migrations(conn):
+            print("No pending migrations")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,23 @@
+-- Indexes for the lookups on the call and dashboard hot paths.
+
+-- assistant-request / end-of-call-report / landing page: orgs by lot phone number.
+-- Each Vapi number belongs to exactly one org; orgs without a number are left out.
+CREATE UNIQUE INDEX IF NOT EXISTS orgs_phone_number_key
+    ON orgs (phone_number)
+    WHERE phone_number IS NOT NULL;
+
+-- Every authenticated route maps the user to an org through profiles.org_id
+CREATE INDEX IF NOT EXISTS profiles_org_id_idx
+    ON profiles (org_id);
+
+-- GET /vehicles keyset pagination: (created_at, id) DESC within an org
+CREATE INDEX IF NOT EXISTS vehicles_org_id_created_at_id_idx
+    ON vehicles (org_id, created_at DESC, id DESC);
+
+-- check_date_open: exception hours for an org on a date
+CREATE INDEX IF NOT EXISTS exception_dates_org_id_date_idx
+    ON exception_dates (org_id, date);
+
+-- GET /addresses
+CREATE INDEX IF NOT EXISTS addresses_org_id_idx
+    ON addresses (org_id);
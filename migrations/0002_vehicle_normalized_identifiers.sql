@@ -0,0 +1,20 @@
+-- Normalized VIN / plate (uppercased, separators stripped) so spoken or typed
+-- variants like "abc-123" and "ABC 123" match the stored "ABC123".
+-- Generated columns keep them in sync with every write path; check_vehicle's VIN /
+-- plate lookups within an org use the indexes below.
+
+ALTER TABLE vehicles
+    ADD COLUMN IF NOT EXISTS vin_normalized TEXT
+        GENERATED ALWAYS AS (upper(regexp_replace(coalesce(vin_number, ''), '[^A-Za-z0-9]', '', 'g'))) STORED,
+    ADD COLUMN IF NOT EXISTS plate_normalized TEXT
+        GENERATED ALWAYS AS (upper(regexp_replace(coalesce(plate_number, ''), '[^A-Za-z0-9]', '', 'g'))) STORED;
+
+CREATE INDEX IF NOT EXISTS vehicles_org_id_vin_normalized_idx
+    ON vehicles (org_id, vin_normalized);
+
+CREATE INDEX IF NOT EXISTS vehicles_org_id_plate_normalized_idx
+    ON vehicles (org_id, plate_normalized);
+
+-- Last-4-of-VIN fallback when the caller only has the end of the VIN
+CREATE INDEX IF NOT EXISTS vehicles_org_id_vin_last4_idx
+    ON vehicles (org_id, right(vin_normalized, 4));
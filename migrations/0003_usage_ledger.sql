@@ -0,0 +1,34 @@
+-- Local record of billable call minutes and of each org's last known Autumn entitlement,
+-- so assistant-request can decide whether to take a call without calling Autumn.
+
+-- One row per finished call, written by the usage metering worker when it resolves the
+-- call's org. tracked_at is set once Autumn has accepted the minutes.
+CREATE TABLE IF NOT EXISTS usage_ledger (
+    call_id TEXT PRIMARY KEY,
+    org_id UUID NOT NULL REFERENCES orgs(id) ON DELETE CASCADE,
+    customer_id UUID NOT NULL,
+    minutes NUMERIC NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    tracked_at TIMESTAMPTZ
+);
+
+-- Minutes Autumn's balance doesn't include yet: untracked, or tracked after the last sync
+CREATE INDEX IF NOT EXISTS usage_ledger_org_id_tracked_at_idx
+    ON usage_ledger (org_id, tracked_at);
+
+-- The org's entitlement as of synced_at (NULL until the first sync with Autumn).
+-- sync_claimed_at lets one worker at a time refresh a row.
+CREATE TABLE IF NOT EXISTS entitlements (
+    org_id UUID PRIMARY KEY REFERENCES orgs(id) ON DELETE CASCADE,
+    customer_id UUID,
+    allowed BOOLEAN,
+    unlimited BOOLEAN,
+    overage_allowed BOOLEAN,
+    balance NUMERIC,
+    next_reset_at TIMESTAMPTZ,
+    synced_at TIMESTAMPTZ,
+    sync_claimed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS entitlements_synced_at_idx
+    ON entitlements (synced_at NULLS FIRST);
@@ -0,0 +1,49 @@
+-- GET /vehicles/search: prefix, substring and full-text matching over plate, VIN,
+-- make, model and owner names within an org.
+--
+-- Requires the pg_trgm extension (PostgreSQL contrib) for the substring index. Supabase
+-- ships it; on a self-hosted server install the contrib package first. CREATE EXTENSION
+-- needs a role allowed to create extensions; if the migration role isn't, have an admin
+-- run it once before migrate.py. Without the extension this migration, and every later
+-- one, fails to apply.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Lowercased searchable text, with the plate and VIN also stripped of separators so
+-- "abc123" finds "ABC-123". Generated columns can't reference each other, so the
+-- normalization is repeated here; concat_ws isn't immutable, so the fields are joined with ||.
+ALTER TABLE vehicles
+    ADD COLUMN IF NOT EXISTS search_text TEXT
+        GENERATED ALWAYS AS (lower(
+            coalesce(plate_number, '') || ' ' ||
+            regexp_replace(coalesce(plate_number, ''), '[^A-Za-z0-9]', '', 'g') || ' ' ||
+            coalesce(vin_number, '') || ' ' ||
+            regexp_replace(coalesce(vin_number, ''), '[^A-Za-z0-9]', '', 'g') || ' ' ||
+            coalesce(make, '') || ' ' || coalesce(model, '') || ' ' ||
+            coalesce(owner_first_name, '') || ' ' || coalesce(owner_last_name, '')
+        )) STORED,
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+        GENERATED ALWAYS AS (to_tsvector('simple',
+            coalesce(plate_number, '') || ' ' || coalesce(vin_number, '') || ' ' ||
+            coalesce(make, '') || ' ' || coalesce(model, '') || ' ' ||
+            coalesce(owner_first_name, '') || ' ' || coalesce(owner_last_name, '')
+        )) STORED;
+
+-- Substring matches (LIKE '%...%')
+CREATE INDEX IF NOT EXISTS vehicles_search_text_trgm_idx
+    ON vehicles USING gin (search_text gin_trgm_ops);
+
+-- Full-text and word-prefix matches
+CREATE INDEX IF NOT EXISTS vehicles_search_vector_idx
+    ON vehicles USING gin (search_vector);
+
+-- Plate / VIN prefix matches (LIKE '...%') within an org
+CREATE INDEX IF NOT EXISTS vehicles_org_id_plate_normalized_prefix_idx
+    ON vehicles (org_id, plate_normalized text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS vehicles_org_id_vin_normalized_prefix_idx
+    ON vehicles (org_id, vin_normalized text_pattern_ops);
+
+-- Filters
+CREATE INDEX IF NOT EXISTS vehicles_org_id_status_idx
+    ON vehicles (org_id, status);
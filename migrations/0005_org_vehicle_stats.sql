@@ -0,0 +1,78 @@
+-- Vehicle counts per org and status for GET /vehicles/stats, kept current by statement-level
+-- triggers so every write path (POST /vehicles, import, batch, delete, status changes) is
+-- covered and a bulk statement costs one upsert per (org, status) it touches, not per row.
+
+CREATE TABLE IF NOT EXISTS org_vehicle_stats (
+    org_id UUID NOT NULL REFERENCES orgs(id) ON DELETE CASCADE,
+    -- Vehicles without a status are counted under ''
+    status TEXT NOT NULL,
+    vehicle_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (org_id, status)
+);
+
+CREATE OR REPLACE FUNCTION org_vehicle_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- Rows are upserted in key order so concurrent writers lock them in the same order
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO org_vehicle_stats AS s (org_id, status, vehicle_count)
+        SELECT org_id, coalesce(status, ''), count(*)
+        FROM new_vehicles
+        WHERE org_id IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (org_id, status) DO UPDATE SET vehicle_count = s.vehicle_count + excluded.vehicle_count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO org_vehicle_stats AS s (org_id, status, vehicle_count)
+        SELECT org_id, coalesce(status, ''), -count(*)
+        FROM old_vehicles
+        WHERE org_id IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (org_id, status) DO UPDATE SET vehicle_count = s.vehicle_count + excluded.vehicle_count;
+    ELSE
+        -- Only statuses (or orgs) that actually changed produce a delta
+        INSERT INTO org_vehicle_stats AS s (org_id, status, vehicle_count)
+        SELECT org_id, status, sum(delta)
+        FROM (
+            SELECT org_id, coalesce(status, '') AS status, 1 AS delta FROM new_vehicles
+            UNION ALL
+            SELECT org_id, coalesce(status, ''), -1 FROM old_vehicles
+        ) changes
+        WHERE org_id IS NOT NULL
+        GROUP BY 1, 2
+        HAVING sum(delta) <> 0
+        ORDER BY 1, 2
+        ON CONFLICT (org_id, status) DO UPDATE SET vehicle_count = s.vehicle_count + excluded.vehicle_count;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Hold off writes while the triggers are created and the counts are backfilled
+LOCK TABLE vehicles IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS vehicles_stats_insert ON vehicles;
+CREATE TRIGGER vehicles_stats_insert
+    AFTER INSERT ON vehicles
+    REFERENCING NEW TABLE AS new_vehicles
+    FOR EACH STATEMENT EXECUTE FUNCTION org_vehicle_stats_apply();
+
+DROP TRIGGER IF EXISTS vehicles_stats_update ON vehicles;
+CREATE TRIGGER vehicles_stats_update
+    AFTER UPDATE ON vehicles
+    REFERENCING OLD TABLE AS old_vehicles NEW TABLE AS new_vehicles
+    FOR EACH STATEMENT EXECUTE FUNCTION org_vehicle_stats_apply();
+
+DROP TRIGGER IF EXISTS vehicles_stats_delete ON vehicles;
+CREATE TRIGGER vehicles_stats_delete
+    AFTER DELETE ON vehicles
+    REFERENCING OLD TABLE AS old_vehicles
+    FOR EACH STATEMENT EXECUTE FUNCTION org_vehicle_stats_apply();
+
+DELETE FROM org_vehicle_stats;
+INSERT INTO org_vehicle_stats (org_id, status, vehicle_count)
+SELECT org_id, coalesce(status, ''), count(*)
+FROM vehicles
+WHERE org_id IS NOT NULL
+GROUP BY 1, 2;
@@ -0,0 +1,144 @@
+# org_queries.py
+from db import pool
+from pagination import encode_cursor, decode_cursor
+
+# The orgs columns GET /orgs/content returns, in response order
+ORG_CONTENT_COLUMNS = [
+    "default_hours_of_operation",
+    "agent_name",
+    "company_name",
+    "documents_needed",
+    "cost_to_release_short",
+    "cost_to_release_long",
+    "default_address",
+    "time_zone",
+    "auction_triggers",
+]
+
+
+async def fetch_org_columns(org_id, columns: list[str]) -> dict | None:
+    """
+    The given orgs columns for the org as {column: value}, or None if the org doesn't exist.
+    columns must be column names from this codebase, never request input.
+    """
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                f"""
+                SELECT {', '.join(f'o.{column}' for column in columns)}
+                FROM orgs o
+                WHERE o.id = %s
+                """,
+                (org_id,)
+            )
+            row = await cur.fetchone()
+    if not row:
+        return None
+    return dict(zip(columns, row))
+
+
+async def fetch_exception_dates(org_id) -> dict:
+    """GET /orgs/exception-dates payload: the org's exception dates ordered by date."""
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT
+                    ed.id,
+                    ed.date,
+                    ed.hours
+                FROM exception_dates ed
+                WHERE ed.org_id = %s
+                ORDER BY ed.date
+                """,
+                (org_id,)
+            )
+            rows = await cur.fetchall()
+
+    # Convert rows to list of dictionaries for easy frontend consumption
+    exception_dates = [{"id": row[0], "date": row[1], "hours": row[2]} for row in rows]
+    return {
+        "exception_dates": exception_dates,
+        "count": len(exception_dates)
+    }
+
+
+async def fetch_addresses(org_id) -> dict:
+    """GET /addresses payload: every address of the org."""
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT
+                    a.id,
+                    a.address
+                FROM addresses a
+                WHERE a.org_id = %s
+                """,
+                (org_id,)
+            )
+            rows = await cur.fetchall()
+
+    return {
+        "addresses": [{"id": row[0], "address": row[1]} for row in rows]
+    }
+
+
+async def fetch_vehicle_page(org_id, page_size: int, cursor: str | None = None, page: int = 0) -> dict:
+    """
+    GET /vehicles payload: one page of the org's vehicles, most recent first. Keyset
+    paged when cursor is given, otherwise page is used as an OFFSET (deprecated).
+    Raises HTTPException(400) for a cursor that can't be decoded.
+    """
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        keyset_filter = "AND (v.created_at, v.id) < (%s, %s)"
+        params = (org_id, after_created_at, after_id, page_size + 1, 0)
+    else:
+        keyset_filter = ""
+        params = (org_id, page_size + 1, page * page_size)
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            # Query one extra row to know whether there is a next page
+            await cur.execute(
+                f"""
+                SELECT
+                    v.id,
+                    v.created_at,
+                    v.status,
+                    v.make,
+                    v.model,
+                    v.year,
+                    v.color,
+                    v.vin_number,
+                    v.plate_number,
+                    v.owner_first_name,
+                    v.owner_last_name,
+                    v.location
+                FROM vehicles v
+                WHERE v.org_id = %s
+                {keyset_filter}
+                ORDER BY v.created_at DESC, v.id DESC
+                LIMIT %s OFFSET %s
+                """,
+                params
+            )
+            rows = await cur.fetchall()
+            # Get column names from cursor description
+            column_names = [desc[0] for desc in cur.description]
+
+    vehicles = [dict(zip(column_names, row)) for row in rows[:page_size]]
+
+    next_cursor = None
+    if len(rows) > page_size:
+        last = vehicles[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+
+    return {
+        "vehicles": vehicles,
+        "page": page,
+        "page_size": page_size,
+        "count": len(vehicles),
+        "next_cursor": next_cursor
+    }
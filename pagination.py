@@ -0,0 +1,26 @@
+# pagination.py
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    """Opaque cursor pointing just past the given row in (created_at DESC, id DESC) order."""
+    payload = json.dumps([created_at.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), row_id
+    except Exception:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
@@ -22,6 +22,7 @@ from routes.orgs_routes.costs_routes.get_customer_portal import router as get_cu
 from routes.aux_routes.make_user import router as make_user_router
 from routes.aux_routes.SubscribeURL import router as subscribe_url_router
 from routes.aux_routes.check_if_subscribed import router as check_if_subscribed_router
+from routes.dashboard_routes.dashboard_bootstrap import router as dashboard_bootstrap_router
 import importlib.util
 import sys
 import os
@@ -46,6 +47,43 @@ sys.modules["delete_vehicle"] = delete_vehicle_module
 spec.loader.exec_module(delete_vehicle_module)
 delete_vehicle_router = delete_vehicle_module.router
 
+# Imports AddVehicleRequest from the add_vehicle module registered above
+import_vehicles_path = os.path.join(os.path.dirname(__file__), 'routes', 'vehicle_routes.py', 'import_vehicles.py')
+spec = importlib.util.spec_from_file_location("import_vehicles", import_vehicles_path)
+import_vehicles_module = importlib.util.module_from_spec(spec)
+sys.modules["import_vehicles"] = import_vehicles_module
+spec.loader.exec_module(import_vehicles_module)
+import_vehicles_router = import_vehicles_module.router
+
+export_vehicles_path = os.path.join(os.path.dirname(__file__), 'routes', 'vehicle_routes.py', 'export_vehicles.py')
+spec = importlib.util.spec_from_file_location("export_vehicles", export_vehicles_path)
+export_vehicles_module = importlib.util.module_from_spec(spec)
+sys.modules["export_vehicles"] = export_vehicles_module
+spec.loader.exec_module(export_vehicles_module)
+export_vehicles_router = export_vehicles_module.router
+
+# Imports AddVehicleRequest from the add_vehicle module registered above
+batch_vehicles_path = os.path.join(os.path.dirname(__file__), 'routes', 'vehicle_routes.py', 'batch_vehicles.py')
+spec = importlib.util.spec_from_file_location("batch_vehicles", batch_vehicles_path)
+batch_vehicles_module = importlib.util.module_from_spec(spec)
+sys.modules["batch_vehicles"] = batch_vehicles_module
+spec.loader.exec_module(batch_vehicles_module)
+batch_vehicles_router = batch_vehicles_module.router
+
+search_vehicles_path = os.path.join(os.path.dirname(__file__), 'routes', 'vehicle_routes.py', 'search_vehicles.py')
+spec = importlib.util.spec_from_file_location("search_vehicles", search_vehicles_path)
+search_vehicles_module = importlib.util.module_from_spec(spec)
+sys.modules["search_vehicles"] = search_vehicles_module
+spec.loader.exec_module(search_vehicles_module)
+search_vehicles_router = search_vehicles_module.router
+
+get_vehicle_stats_path = os.path.join(os.path.dirname(__file__), 'routes', 'vehicle_routes.py', 'get_vehicle_stats.py')
+spec = importlib.util.spec_from_file_location("get_vehicle_stats", get_vehicle_stats_path)
+get_vehicle_stats_module = importlib.util.module_from_spec(spec)
+sys.modules["get_vehicle_stats"] = get_vehicle_stats_module
+spec.loader.exec_module(get_vehicle_stats_module)
+get_vehicle_stats_router = get_vehicle_stats_module.router
+
 get_addresses_path = os.path.join(os.path.dirname(__file__), 'routes', 'vehicle_routes.py', 'get_addresses.py')
 spec = importlib.util.spec_from_file_location("get_addresses", get_addresses_path)
 get_addresses_module = importlib.util.module_from_spec(spec)
@@ -67,4 +105,4 @@ sys.modules["delete_address"] = delete_address_module
 spec.loader.exec_module(delete_address_module)
 delete_address_router = delete_address_module.router
 
-routers=[vapi_webhook_router, create_free_vapi_phone_number_router, change_free_vapi_phone_number_router, get_vapi_phone_number_from_database_router, change_agent_name_router, change_company_name_router, change_default_address_router, change_time_zone_router, change_default_hours_router, get_exception_dates_router, create_exception_date_router, delete_exception_date_router, update_exception_date_router, get_items_needed_router, change_documents_needed_router, change_auction_triggers_router, get_orgs_content_router, get_orgs_content_by_phone_router, change_cost_to_release_long_router, change_cost_to_release_short_router, get_customer_portal_router, vehicle_pagination_router, add_vehicle_router, delete_vehicle_router, get_addresses_router, add_address_router, delete_address_router, make_user_router, subscribe_url_router, check_if_subscribed_router]
\ No newline at end of file
+routers=[vapi_webhook_router, create_free_vapi_phone_number_router, change_free_vapi_phone_number_router, get_vapi_phone_number_from_database_router, change_agent_name_router, change_company_name_router, change_default_address_router, change_time_zone_router, change_default_hours_router, get_exception_dates_router, create_exception_date_router, delete_exception_date_router, update_exception_date_router, get_items_needed_router, change_documents_needed_router, change_auction_triggers_router, get_orgs_content_router, get_orgs_content_by_phone_router, change_cost_to_release_long_router, change_cost_to_release_short_router, get_customer_portal_router, vehicle_pagination_router, add_vehicle_router, delete_vehicle_router, import_vehicles_router, export_vehicles_router, batch_vehicles_router, search_vehicles_router, get_vehicle_stats_router, get_addresses_router, add_address_router, delete_address_router, make_user_router, subscribe_url_router, check_if_subscribed_router, dashboard_bootstrap_router]
\ No newline at end of file
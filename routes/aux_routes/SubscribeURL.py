@@ -1,29 +1,33 @@
 import os
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-import autumn
+import autumn_client
 from auth import get_current_user
+from cache import entitlement_cache
 
 load_dotenv()
 
-# Get Autumn secret key from environment variables
-AUTUMN_SECRET_KEY = os.getenv("AUTUMN_SECRET_KEY")
-if not AUTUMN_SECRET_KEY:
-    raise RuntimeError("AUTUMN_SECRET_KEY is not set in .env")
-
 # Optional: Default product ID from environment (can be overridden in request)
 DEFAULT_PRODUCT_ID = os.getenv("AUTUMN_PRODUCT_ID")
 
 FRONTEND_URL = os.getenv("FRONTEND_URL")
 FRONTEND_URL = FRONTEND_URL + "/dashboard/phone_number"
 
-# Initialize Autumn client
-autumn_client = autumn.Autumn(token=AUTUMN_SECRET_KEY)
+# Added to the checkout success redirect; the dashboard passes it on as
+# GET /check-subscription?refresh=true so the first load after paying isn't a cached status
+REFRESH_SUBSCRIPTION_PARAM = "refresh_subscription"
 
 router = APIRouter()
 
 
+def with_refresh_flag(url: str) -> str:
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + [(REFRESH_SUBSCRIPTION_PARAM, "true")]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
 class SubscribeURLRequest(BaseModel):
     """Request model for getting a subscription checkout URL."""
     product_id: str | None = None  # Optional product_id, will use env default if not provided
@@ -44,7 +48,7 @@ async def get_subscribe_url(
     
     Request body (optional):
     - product_id (str): Product ID to subscribe to. If not provided, uses AUTUMN_PRODUCT_ID from .env
-    - success_url (str): URL to redirect to after successful purchase
+    - success_url (str): URL to redirect to after successful purchase; refresh_subscription=true is added to it
     
     Returns:
     - url (str): Stripe checkout URL to redirect the user to
@@ -74,9 +78,13 @@ async def get_subscribe_url(
         # Add optional success_url if provided
         if body.success_url:
             checkout_params["success_url"] = body.success_url
+        checkout_params["success_url"] = with_refresh_flag(checkout_params["success_url"])
         
         # Call Autumn checkout API
         response = await autumn_client.checkout(**checkout_params)
+        # Checkout may attach the product right away (payment method on file), and otherwise
+        # the user is about to pay, so don't keep serving the old status
+        entitlement_cache.pop(user_id)
         print(FRONTEND_URL)
         # Return the checkout URL and relevant information
         # CheckoutResponse is an object, not a dict, so access attributes directly
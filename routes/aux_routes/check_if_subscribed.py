@@ -1,55 +1,38 @@
 import os
+import time
+import asyncio
 from dotenv import load_dotenv
-from fastapi import APIRouter, HTTPException, Depends
-import autumn
+from fastapi import APIRouter, HTTPException, Depends, Query
+import autumn_client
 from auth import get_current_user
+from cache import entitlement_cache
 
 load_dotenv()
 
-# Get Autumn secret key from environment variables
-AUTUMN_SECRET_KEY = os.getenv("AUTUMN_SECRET_KEY")
-if not AUTUMN_SECRET_KEY:
-    raise RuntimeError("AUTUMN_SECRET_KEY is not set in .env")
-
 # Get feature ID from environment variables
 AUTUMN_FEATURE_ID = os.getenv("AUTUMN_FEATURE_ID")
 if not AUTUMN_FEATURE_ID:
     raise RuntimeError("AUTUMN_FEATURE_ID is not set in .env")
 
-# Initialize Autumn client
-autumn_client = autumn.Autumn(token=AUTUMN_SECRET_KEY)
+# A cached status is served as is for this long; after that an allowed status is still
+# served, but refreshed from Autumn in the background (stale-while-revalidate)
+ENTITLEMENT_FRESH_SECONDS = 30
+
+# Customer id -> background refresh, so a customer has at most one running
+_refreshing: dict[str, asyncio.Task] = {}
 
 router = APIRouter()
 
 
-@router.get("/check-subscription")
-async def check_if_subscribed(
-    current_user: dict = Depends(get_current_user)
-):
+async def fetch_subscription_status(user_id: str) -> dict:
     """
-    Check if the authenticated user is subscribed to the preset feature.
-    Requires authentication via Bearer token in Authorization header.
-    
-    The user's ID from the authentication token will be used as the customer_id for Autumn.
-    If the customer doesn't exist in Autumn, it will be automatically created.
-    
-    Returns:
-    - allowed (bool): Whether the customer has access to the feature
-    - code (str): Code describing the result of the check
-    - customer_id (str): ID of the customer
-    - feature_id (str): ID of the feature
-    - balance (number | null): The remaining available balance
-    - usage (number | null): The total cumulative usage consumed
-    - included_usage (number | null): The total amount of usage included
-    - next_reset_at (number | null): Unix timestamp when usage counter will reset
-    - overage_allowed (bool | null): Whether customer can continue using beyond included usage
+    Run the Autumn check for the user and return the fields the dashboard uses.
+    Raises HTTPException(500) if Autumn can't be reached.
     """
-    
-    user_id = current_user['id']
-    
     try:
         # Call Autumn check API to verify subscription status
         # According to Autumn docs: POST /check with customer_id and feature_id
+        # Concurrent checks for the same customer (e.g. several open tabs) share one request
         response = await autumn_client.check(
             customer_id=user_id,
             feature_id=AUTUMN_FEATURE_ID
@@ -88,3 +71,66 @@ async def check_if_subscribed(
             status_code=500,
             detail=error_detail
         )
+
+
+async def _refresh_subscription_status(user_id: str, stale: tuple) -> None:
+    try:
+        status = await fetch_subscription_status(user_id)
+    except HTTPException as e:
+        # Keep serving the stale status; the next read past the fresh window tries again
+        print(f"Error refreshing subscription status for {user_id}: {e.detail}")
+        return
+    # If checkout or tracked usage dropped the entry meanwhile, this result may predate it
+    if entitlement_cache.get(user_id) is stale:
+        entitlement_cache.set(user_id, (time.monotonic(), status))
+
+
+async def get_subscription_status(user_id: str, refresh: bool = False) -> dict:
+    """
+    The user's subscription status, from entitlement_cache when possible. An allowed status
+    older than ENTITLEMENT_FRESH_SECONDS is returned right away and refreshed in the
+    background. A status that isn't allowed is never served stale, since the user may have
+    just paid, and refresh=True (the checkout success redirect) always asks Autumn.
+    Raises HTTPException(500) if Autumn has to be asked and can't be reached.
+    """
+    cached = entitlement_cache.get(user_id)
+    if cached is not None and not refresh:
+        fetched_at, status = cached
+        is_fresh = time.monotonic() - fetched_at <= ENTITLEMENT_FRESH_SECONDS
+        if is_fresh or status["allowed"]:
+            if not is_fresh and user_id not in _refreshing:
+                task = asyncio.create_task(_refresh_subscription_status(user_id, cached))
+                _refreshing[user_id] = task
+                task.add_done_callback(lambda _: _refreshing.pop(user_id, None))
+            return status
+
+    status = await fetch_subscription_status(user_id)
+    entitlement_cache.set(user_id, (time.monotonic(), status))
+    return status
+
+
+@router.get("/check-subscription")
+async def check_if_subscribed(
+    refresh: bool = Query(default=False, description="Skip the cached status and ask Autumn, e.g. right after checkout"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Check if the authenticated user is subscribed to the preset feature.
+    Requires authentication via Bearer token in Authorization header.
+    
+    The user's ID from the authentication token will be used as the customer_id for Autumn.
+    If the customer doesn't exist in Autumn, it will be automatically created.
+    
+    Returns:
+    - allowed (bool): Whether the customer has access to the feature
+    - code (str): Code describing the result of the check
+    - customer_id (str): ID of the customer
+    - feature_id (str): ID of the feature
+    - balance (number | null): The remaining available balance
+    - usage (number | null): The total cumulative usage consumed
+    - included_usage (number | null): The total amount of usage included
+    - next_reset_at (number | null): Unix timestamp when usage counter will reset
+    - overage_allowed (bool | null): Whether customer can continue using beyond included usage
+    """
+    
+    return await get_subscription_status(current_user['id'], refresh=refresh)
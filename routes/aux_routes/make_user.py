@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from auth import get_current_user
 from db import pool
+from cache import user_org_cache
 
 router = APIRouter()
 
@@ -38,10 +39,10 @@ async def make_user(
         )
     
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
                 # Check if profile already exists
-                cur.execute(
+                await cur.execute(
                     """
                     SELECT id, org_id, created_at
                     FROM profiles
@@ -50,7 +51,7 @@ async def make_user(
                     (user_id,)
                 )
                 
-                existing_profile = cur.fetchone()
+                existing_profile = await cur.fetchone()
                 
                 if existing_profile:
                     # Profile already exists, return existing data
@@ -62,14 +63,14 @@ async def make_user(
                     }
                 
                 # Step 1: Insert into orgs table (id and created_at will be auto-generated)
-                cur.execute(
+                await cur.execute(
                     """
                     INSERT INTO orgs DEFAULT VALUES
                     RETURNING id, created_at
                     """
                 )
                 
-                org_row = cur.fetchone()
+                org_row = await cur.fetchone()
                 if not org_row:
                     raise HTTPException(
                         status_code=500,
@@ -79,7 +80,7 @@ async def make_user(
                 org_id = org_row[0]
                 
                 # Step 2: Insert into profiles table with org_id and user_id
-                cur.execute(
+                await cur.execute(
                     """
                     INSERT INTO profiles (id, org_id)
                     VALUES (%s, %s)
@@ -88,14 +89,17 @@ async def make_user(
                     (user_id, org_id)
                 )
                 
-                profile_row = cur.fetchone()
+                profile_row = await cur.fetchone()
                 if not profile_row:
                     raise HTTPException(
                         status_code=500,
                         detail="Failed to create profile"
                     )
                 
-                conn.commit()
+                await conn.commit()
+                
+                # get_current_org_id resolves this user without another profiles lookup
+                user_org_cache.set(user_id, str(org_id))
                 
                 return {
                     "message": "User created successfully",
@@ -0,0 +1,81 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Query
+from auth import get_current_user, get_current_org_id
+from org_queries import ORG_CONTENT_COLUMNS, fetch_org_columns, fetch_exception_dates, fetch_addresses, fetch_vehicle_page
+from pagination import DEFAULT_PAGE_SIZE
+from routes.aux_routes.check_if_subscribed import get_subscription_status
+
+router = APIRouter()
+
+# Autumn can be slow to fail; past this the dashboard loads without it and retries /check-subscription
+SUBSCRIPTION_TIMEOUT_SECONDS = 5
+
+
+@router.get("/dashboard/bootstrap")
+async def get_dashboard_bootstrap(
+    refresh_subscription: bool = Query(default=False, description="Skip the cached subscription status, e.g. right after checkout"),
+    current_user: dict = Depends(get_current_user),
+    org_id: str = Depends(get_current_org_id)
+):
+    """
+    Everything the dashboard needs on load, in one request.
+    Requires authentication via Bearer token in Authorization header.
+
+    Each key holds the same payload as the endpoint the dashboard used to call for it:
+    - org: GET /orgs/content
+    - documents_needed: GET /orgs/documents-needed
+    - phone_number: GET /phone-number
+    - exception_dates: GET /orgs/exception-dates
+    - addresses: GET /addresses
+    - vehicles: the first page of GET /vehicles
+    - subscription: GET /check-subscription (refresh_subscription=true maps to its refresh=true)
+
+    The org is resolved once, then the remaining queries and the Autumn check run concurrently.
+    If one section fails, it is null and its error is reported under errors.
+    """
+
+    user_id = current_user['id']
+
+    try:
+        org = await fetch_org_columns(org_id, ORG_CONTENT_COLUMNS + ["phone_number"])
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching organization content: {str(e)}"
+        )
+
+    if org is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No organization found for this user"
+        )
+
+    phone_number = org.pop("phone_number")
+
+    sections = {
+        "exception_dates": fetch_exception_dates(org_id),
+        "addresses": fetch_addresses(org_id),
+        "vehicles": fetch_vehicle_page(org_id, DEFAULT_PAGE_SIZE),
+        "subscription": asyncio.wait_for(get_subscription_status(user_id, refresh=refresh_subscription), SUBSCRIPTION_TIMEOUT_SECONDS),
+    }
+    results = await asyncio.gather(*sections.values(), return_exceptions=True)
+
+    payload = {
+        "org": org,
+        "documents_needed": {"documents_needed": org["documents_needed"]},
+        "phone_number": {"phone_number": phone_number},
+        "errors": {},
+    }
+    for name, result in zip(sections, results):
+        if isinstance(result, BaseException):
+            payload[name] = None
+            if isinstance(result, HTTPException):
+                payload["errors"][name] = result.detail
+            elif isinstance(result, asyncio.TimeoutError):
+                payload["errors"][name] = "Timed out"
+            else:
+                payload["errors"][name] = str(result)
+        else:
+            payload[name] = result
+
+    return payload
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
+from cache import invalidate_org
+from invalidation import notify_org_changed
 
 router = APIRouter()
 
@@ -13,26 +15,23 @@ class ChangeDefaultAddressRequest(BaseModel):
 @router.patch("/orgs/default-address")
 async def change_default_address(
     body: ChangeDefaultAddressRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Update the default_address column in the orgs table for the user's organization.
     Requires authentication via Bearer token in Authorization header.
     """
     
-    user_id = current_user['id']
-    
     # Update the default_address in orgs table
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
                 UPDATE orgs
                 SET default_address = %s
-                FROM profiles
-                WHERE orgs.id = profiles.org_id AND profiles.id = %s
+                WHERE id = %s
                 """,
-                (body.default_address, user_id)
+                (body.default_address, org_id)
             )
             
             # Check if any rows were updated
@@ -42,6 +41,10 @@ async def change_default_address(
                     detail="No organization found for this user"
                 )
             
-            conn.commit()
+            await notify_org_changed(cur, org_id)
+            await conn.commit()
+    
+    # Make the next inbound call pick up the change
+    invalidate_org(org_id)
     
     return {"message": "Default address updated successfully", "default_address": body.default_address}
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, field_validator
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
+from cache import invalidate_org
+from invalidation import notify_org_changed
 
 router = APIRouter()
 
@@ -60,7 +62,7 @@ class ChangeDefaultHoursRequest(BaseModel):
 @router.patch("/orgs/default-hours")
 async def change_default_hours(
     body: ChangeDefaultHoursRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Update the default_hours_of_operation column in the orgs table for the user's organization.
@@ -75,19 +77,16 @@ async def change_default_hours(
     * Sunday: 4:00 AM - 7PM 
     """
     
-    user_id = current_user['id']
-    
     # Update the default_hours_of_operation in orgs table
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
                 UPDATE orgs
                 SET default_hours_of_operation = %s
-                FROM profiles
-                WHERE orgs.id = profiles.org_id AND profiles.id = %s
+                WHERE id = %s
                 """,
-                (body.default_hours_of_operation, user_id)
+                (body.default_hours_of_operation, org_id)
             )
             
             # Check if any rows were updated
@@ -97,6 +96,10 @@ async def change_default_hours(
                     detail="No organization found for this user"
                 )
             
-            conn.commit()
+            await notify_org_changed(cur, org_id)
+            await conn.commit()
+    
+    # Make the next inbound call pick up the change
+    invalidate_org(org_id)
     
     return {"message": "Default hours of operation updated successfully", "default_hours_of_operation": body.default_hours_of_operation}
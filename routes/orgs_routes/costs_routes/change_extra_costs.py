@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, field_validator
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
+from cache import invalidate_org
+from invalidation import notify_org_changed
 
 router = APIRouter()
 
@@ -49,7 +51,7 @@ class ChangeCostToReleaseLongRequest(BaseModel):
 @router.patch("/orgs/cost-to-release-long")
 async def change_cost_to_release_long(
     body: ChangeCostToReleaseLongRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Update the cost_to_release_long (TEXT) column in the orgs table for the user's organization.
@@ -57,22 +59,19 @@ async def change_cost_to_release_long(
     Requires authentication via Bearer token in Authorization header.
     """
     
-    user_id = current_user['id']
-    
     # Convert empty strings to None (NULL in database)
     cost_to_release_long_value = body.cost_to_release_long.strip() if body.cost_to_release_long and body.cost_to_release_long.strip() else None
     
     # Update the cost_to_release_long in orgs table
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
                 UPDATE orgs
                 SET cost_to_release_long = %s
-                FROM profiles
-                WHERE orgs.id = profiles.org_id AND profiles.id = %s
+                WHERE id = %s
                 """,
-                (cost_to_release_long_value, user_id)
+                (cost_to_release_long_value, org_id)
             )
             
             # Check if any rows were updated
@@ -82,7 +81,11 @@ async def change_cost_to_release_long(
                     detail="No organization found for this user"
                 )
             
-            conn.commit()
+            await notify_org_changed(cur, org_id)
+            await conn.commit()
+    
+    # Make the next inbound call pick up the change
+    invalidate_org(org_id)
     
     return {
         "message": "Cost to release long updated successfully",
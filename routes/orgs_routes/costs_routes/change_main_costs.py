@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, field_validator
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
+from cache import invalidate_org
+from invalidation import notify_org_changed
 
 router = APIRouter()
 
@@ -47,7 +49,7 @@ class ChangeCostToReleaseShortRequest(BaseModel):
 @router.patch("/orgs/cost-to-release-short")
 async def change_cost_to_release_short(
     body: ChangeCostToReleaseShortRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Update the cost_to_release_short (TEXT) column in the orgs table for the user's organization.
@@ -55,19 +57,16 @@ async def change_cost_to_release_short(
     Requires authentication via Bearer token in Authorization header.
     """
     
-    user_id = current_user['id']
-    
     # Update the cost_to_release_short in orgs table
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
                 UPDATE orgs
                 SET cost_to_release_short = %s
-                FROM profiles
-                WHERE orgs.id = profiles.org_id AND profiles.id = %s
+                WHERE id = %s
                 """,
-                (body.cost_to_release_short, user_id)
+                (body.cost_to_release_short, org_id)
             )
             
             # Check if any rows were updated
@@ -77,7 +76,11 @@ async def change_cost_to_release_short(
                     detail="No organization found for this user"
                 )
             
-            conn.commit()
+            await notify_org_changed(cur, org_id)
+            await conn.commit()
+    
+    # Make the next inbound call pick up the change
+    invalidate_org(org_id)
     
     return {
         "message": "Cost to release short updated successfully",
@@ -2,23 +2,15 @@ import os
 from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-import autumn
+import autumn_client
 from auth import get_current_user
 
 load_dotenv()
 
-# Get Autumn secret key from environment variables
-AUTUMN_SECRET_KEY = os.getenv("AUTUMN_SECRET_KEY")
-if not AUTUMN_SECRET_KEY:
-    raise RuntimeError("AUTUMN_SECRET_KEY is not set in .env")
-
 # Get frontend URL for return redirect
 FRONTEND_URL = os.getenv("FRONTEND_URL")
 DEFAULT_RETURN_URL = f"{FRONTEND_URL}/dashboard/billing" if FRONTEND_URL else None
 
-# Initialize Autumn client
-autumn_client = autumn.Autumn(token=AUTUMN_SECRET_KEY)
-
 router = APIRouter()
 
 
@@ -72,8 +64,8 @@ async def get_customer_portal(
             portal_params["return_url"] = return_url
         
         # Call Autumn billing portal API using SDK
-        # Based on Autumn docs: autumn_client.customers.get_billing_portal()
-        response = await autumn_client.customers.get_billing_portal(**portal_params)
+        # Based on Autumn docs: customers.get_billing_portal()
+        response = await autumn_client.get_billing_portal(**portal_params)
         
         # Return the billing portal URL and relevant information
         # Response is an object, so access attributes directly
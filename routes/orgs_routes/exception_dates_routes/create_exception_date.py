@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
+from invalidation import notify_org_changed
 
 router = APIRouter()
 
@@ -14,7 +15,7 @@ class CreateExceptionDateRequest(BaseModel):
 @router.post("/orgs/exception-dates")
 async def create_exception_date(
     body: CreateExceptionDateRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Create a new exception date entry in the exception_dates table.
@@ -24,37 +25,14 @@ async def create_exception_date(
     - date (str): The date for the exception (TEXT format)
     - hours (str): The hours for the exception (TEXT format)
     
-    The org_id will be automatically retrieved from the user's profile.
+    The org_id is the authenticated user's organization.
     """
     
-    user_id = current_user['id']
-    
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                # First, get the org_id from the profiles table
-                cur.execute(
-                    """
-                    SELECT org_id
-                    FROM profiles
-                    WHERE id = %s
-                    LIMIT 1
-                    """,
-                    (user_id,)
-                )
-                
-                row = cur.fetchone()
-                
-                if not row or not row[0]:
-                    raise HTTPException(
-                        status_code=404,
-                        detail="No organization found for this user"
-                    )
-                
-                org_id = row[0]
-                
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
                 # Insert the new exception date entry
-                cur.execute(
+                await cur.execute(
                     """
                     INSERT INTO exception_dates (date, hours, org_id)
                     VALUES (%s, %s, %s)
@@ -64,8 +42,9 @@ async def create_exception_date(
                 )
                 
                 # Fetch the inserted row to return
-                inserted_row = cur.fetchone()
-                conn.commit()
+                inserted_row = await cur.fetchone()
+                await notify_org_changed(cur, org_id)
+                await conn.commit()
                 
                 return {
                     "message": "Exception date created successfully",
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
+from invalidation import notify_org_changed
 
 router = APIRouter()
 
@@ -14,7 +15,7 @@ class UpdateExceptionDateRequest(BaseModel):
 @router.patch("/orgs/exception-dates")
 async def update_exception_date(
     body: UpdateExceptionDateRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Update the hours column of an exception date entry in the exception_dates table.
@@ -28,42 +29,27 @@ async def update_exception_date(
     before updating it.
     """
     
-    user_id = current_user['id']
-    
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                # First, verify the exception date exists and belongs to the user's organization
-                cur.execute(
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                # The org_id filter makes sure the exception date belongs to the user's organization
+                await cur.execute(
                     """
-                    SELECT ed.id
-                    FROM exception_dates ed
-                    INNER JOIN profiles p ON ed.org_id = p.org_id
-                    WHERE ed.id = %s AND p.id = %s
-                    LIMIT 1
+                    UPDATE exception_dates
+                    SET hours = %s
+                    WHERE id = %s AND org_id = %s
                     """,
-                    (body.id, user_id)
+                    (body.hours, body.id, org_id)
                 )
                 
-                row = cur.fetchone()
-                
-                if not row:
+                if cur.rowcount == 0:
                     raise HTTPException(
                         status_code=404,
                         detail="Exception date not found or does not belong to your organization"
                     )
                 
-                # Update the hours column
-                cur.execute(
-                    """
-                    UPDATE exception_dates
-                    SET hours = %s
-                    WHERE id = %s
-                    """,
-                    (body.hours, body.id)
-                )
-                
-                conn.commit()
+                await notify_org_changed(cur, org_id)
+                await conn.commit()
                 
                 return {
                     "message": "Exception date updated successfully",
@@ -1,67 +1,33 @@
 from fastapi import APIRouter, HTTPException, Depends
-from auth import get_current_user
-from db import pool
+from auth import get_current_org_id
+from org_queries import ORG_CONTENT_COLUMNS, fetch_org_columns
 
 router = APIRouter()
 
 
 @router.get("/orgs/content")
 async def get_orgs_content(
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Get the organization content from the orgs table for the user's organization.
     Returns default_hours_of_operation, agent_name, company_name, documents_needed,
     cost_to_release_short, cost_to_release_long, default_address, time_zone, and auction_triggers columns from the orgs table
-    where orgs.id matches profiles.org_id and profiles.id matches the authenticated user's ID.
+    for the authenticated user's organization.
     Requires authentication via Bearer token in Authorization header.
     """
     
-    user_id = current_user['id']
-    
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                # Query to get org content for the user's organization
-                cur.execute(
-                    """
-                    SELECT 
-                        o.default_hours_of_operation,
-                        o.agent_name,
-                        o.company_name,
-                        o.documents_needed,
-                        o.cost_to_release_short,
-                        o.cost_to_release_long,
-                        o.default_address,
-                        o.time_zone,
-                        o.auction_triggers
-                    FROM orgs o
-                    INNER JOIN profiles p ON o.id = p.org_id
-                    WHERE p.id = %s
-                    """,
-                    (user_id,)
-                )
-                
-                row = cur.fetchone()
-                
-                # Check if organization was found
-                if not row:
-                    raise HTTPException(
-                        status_code=404,
-                        detail="No organization found for this user"
-                    )
-                
-                return {
-                    "default_hours_of_operation": row[0],
-                    "agent_name": row[1],
-                    "company_name": row[2],
-                    "documents_needed": row[3],
-                    "cost_to_release_short": row[4],
-                    "cost_to_release_long": row[5],
-                    "default_address": row[6],
-                    "time_zone": row[7],
-                    "auction_triggers": row[8]
-                }
+        org = await fetch_org_columns(org_id, ORG_CONTENT_COLUMNS)
+        
+        # Check if organization was found
+        if org is None:
+            raise HTTPException(
+                status_code=404,
+                detail="No organization found for this user"
+            )
+        
+        return org
                 
     except HTTPException:
         raise
@@ -27,10 +27,10 @@ async def get_orgs_content_by_phone(phone_number: str):
     """
     
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
                 # Query to get org content by phone number (same as webhook)
-                cur.execute(
+                await cur.execute(
                     """
                     SELECT 
                         id,
@@ -49,7 +49,7 @@ async def get_orgs_content_by_phone(phone_number: str):
                     (phone_number,)
                 )
                 
-                row = cur.fetchone()
+                row = await cur.fetchone()
                 
                 # Check if organization was found
                 if not row:
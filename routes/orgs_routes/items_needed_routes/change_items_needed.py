@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, field_validator
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
+from cache import invalidate_org
+from invalidation import notify_org_changed
 
 router = APIRouter()
 
@@ -49,7 +51,7 @@ class ChangeDocumentsNeededRequest(BaseModel):
 @router.patch("/orgs/documents-needed")
 async def change_documents_needed(
     body: ChangeDocumentsNeededRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Update the documents_needed (TEXT) column in the orgs table for the user's organization.
@@ -57,22 +59,19 @@ async def change_documents_needed(
     Requires authentication via Bearer token in Authorization header.
     """
     
-    user_id = current_user['id']
-    
     # Convert empty strings to None (NULL in database)
     documents_needed_value = body.documents_needed.strip() if body.documents_needed and body.documents_needed.strip() else None
     
     # Update the documents_needed in orgs table
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
                 UPDATE orgs
                 SET documents_needed = %s
-                FROM profiles
-                WHERE orgs.id = profiles.org_id AND profiles.id = %s
+                WHERE id = %s
                 """,
-                (documents_needed_value, user_id)
+                (documents_needed_value, org_id)
             )
             
             # Check if any rows were updated
@@ -82,7 +81,11 @@ async def change_documents_needed(
                     detail="No organization found for this user"
                 )
             
-            conn.commit()
+            await notify_org_changed(cur, org_id)
+            await conn.commit()
+    
+    # Make the next inbound call pick up the change
+    invalidate_org(org_id)
     
     return {
         "message": "Documents needed updated successfully",
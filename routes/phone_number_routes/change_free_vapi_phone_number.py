@@ -1,18 +1,15 @@
 # main.py
 
-import os
 from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, AnyHttpUrl
-import httpx
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
+from cache import org_config_cache
+from invalidation import notify_org_changed
+from vapi_client import vapi_request
 load_dotenv()
 
-VAPI_API_KEY = os.getenv("VAPI_API_KEY")
-if not VAPI_API_KEY:
-    raise RuntimeError("VAPI_API_KEY is not set in .env")
-
 router = APIRouter()
 
 
@@ -32,7 +29,7 @@ class ChangeVapiNumberRequest(BaseModel):
 @router.patch("/vapi/phone-numbers/free")
 async def change_free_vapi_phone_number(
     body: ChangeVapiNumberRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Change/update an existing FREE Vapi phone number configuration.
@@ -41,22 +38,18 @@ async def change_free_vapi_phone_number(
     Requires authentication via Bearer token in Authorization header.
     """
     
-    user_id = current_user['id']
-    
-    # Step 1: Get phone_id from orgs table using current_user id
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+    # Step 1: Get phone_id from the user's org
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
                 SELECT orgs.phone_id, orgs.phone_number
                 FROM orgs
-                JOIN profiles ON orgs.id = profiles.org_id
-                WHERE profiles.id = %s
-                LIMIT 1
+                WHERE orgs.id = %s
                 """,
-                (user_id,)
+                (org_id,)
             )
-            row = cur.fetchone()
+            row = await cur.fetchone()
             
             if not row or not row[0]:
                 raise HTTPException(
@@ -67,11 +60,6 @@ async def change_free_vapi_phone_number(
             old_phone_id = row[0]
             existing_phone_number = row[1]
     
-    headers = {
-        "Authorization": f"Bearer {VAPI_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    
     # Step 2: Handle area_code change (create new number) vs regular update
     if body.area_code:
         # Get existing phone number details to retrieve server_url if not provided
@@ -79,28 +67,24 @@ async def change_free_vapi_phone_number(
         
         if not server_url_to_use:
             # Fetch existing phone number to get its server URL
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                get_resp = await client.get(
-                    f"https://api.vapi.ai/phone-number/{old_phone_id}",
-                    headers=headers
+            get_resp = await vapi_request("GET", f"/phone-number/{old_phone_id}")
+            
+            if get_resp.status_code not in (200, 201):
+                raise HTTPException(
+                    status_code=get_resp.status_code,
+                    detail={"error": f"Failed to fetch existing phone number: {get_resp.text}"},
+                )
+            
+            existing_phone_data = get_resp.json()
+            # Get server URL from existing phone number
+            server_data = existing_phone_data.get("server", {})
+            if server_data and server_data.get("url"):
+                server_url_to_use = server_data["url"]
+            else:
+                raise HTTPException(
+                    status_code=400,
+                    detail="server_url is required when changing area code, and existing number has no server_url configured"
                 )
-                
-                if get_resp.status_code not in (200, 201):
-                    raise HTTPException(
-                        status_code=get_resp.status_code,
-                        detail={"error": f"Failed to fetch existing phone number: {get_resp.text}"},
-                    )
-                
-                existing_phone_data = get_resp.json()
-                # Get server URL from existing phone number
-                server_data = existing_phone_data.get("server", {})
-                if server_data and server_data.get("url"):
-                    server_url_to_use = server_data["url"]
-                else:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="server_url is required when changing area code, and existing number has no server_url configured"
-                    )
         
         # Create new phone number with the desired area code
         create_payload = {
@@ -115,12 +99,7 @@ async def change_free_vapi_phone_number(
         if body.name:
             create_payload["name"] = body.name
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            create_resp = await client.post(
-                "https://api.vapi.ai/phone-number",
-                json=create_payload,
-                headers=headers
-            )
+        create_resp = await vapi_request("POST", "/phone-number", json=create_payload)
         
         if create_resp.status_code not in (200, 201):
             raise HTTPException(
@@ -133,29 +112,29 @@ async def change_free_vapi_phone_number(
         new_phone_number = new_phone_data["number"]
         
         # Delete the old phone number
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            delete_resp = await client.delete(
-                f"https://api.vapi.ai/phone-number/{old_phone_id}",
-                headers=headers
-            )
+        delete_resp = await vapi_request("DELETE", f"/phone-number/{old_phone_id}")
         
         # Note: Don't fail if delete fails - the new number is created and we'll update DB
         if delete_resp.status_code not in (200, 201, 204):
             print(f"Warning: Failed to delete old phone number {old_phone_id}: {delete_resp.text}")
         
         # Update orgs table with new phone number
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
                     """
                     UPDATE orgs
                     SET phone_number = %s, phone_id = %s
-                    FROM profiles
-                    WHERE orgs.id = profiles.org_id AND profiles.id = %s
+                    WHERE id = %s
                     """,
-                    (new_phone_number, new_phone_id, user_id)
+                    (new_phone_number, new_phone_id, org_id)
                 )
-                conn.commit()
+                await notify_org_changed(cur, org_id)
+                await conn.commit()
+        
+        # Calls to either number must re-resolve the org on their next assistant-request
+        org_config_cache.pop(existing_phone_number)
+        org_config_cache.pop(new_phone_number)
         
         return new_phone_data
     
@@ -180,12 +159,7 @@ async def change_free_vapi_phone_number(
             )
         
         # Update the phone number in VAPI
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.patch(
-                f"https://api.vapi.ai/phone-number/{old_phone_id}",
-                json=payload,
-                headers=headers
-            )
+        resp = await vapi_request("PATCH", f"/phone-number/{old_phone_id}", json=payload)
         
         if resp.status_code not in (200, 201):
             raise HTTPException(
@@ -199,17 +173,20 @@ async def change_free_vapi_phone_number(
         updated_phone_number = resp.json().get("number", existing_phone_number)
         
         # Update the orgs table to reflect any changes
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
                     """
                     UPDATE orgs
                     SET phone_number = %s, phone_id = %s
-                    FROM profiles
-                    WHERE orgs.id = profiles.org_id AND profiles.id = %s
+                    WHERE id = %s
                     """,
-                    (updated_phone_number, old_phone_id, user_id)
+                    (updated_phone_number, old_phone_id, org_id)
                 )
-                conn.commit()
+                await notify_org_changed(cur, org_id)
+                await conn.commit()
+        
+        org_config_cache.pop(existing_phone_number)
+        org_config_cache.pop(updated_phone_number)
         
         return resp.json()
@@ -4,15 +4,13 @@ import os
 from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, AnyHttpUrl
-import httpx
-from auth import get_current_user
+from auth import get_current_user, get_current_org_id
 from db import pool
+from cache import org_config_cache
+from invalidation import notify_org_changed
+from vapi_client import vapi_request
 load_dotenv()
 
-VAPI_API_KEY = os.getenv("VAPI_API_KEY")
-if not VAPI_API_KEY:
-    raise RuntimeError("VAPI_API_KEY is not set in .env")
-
 SERVER_URL = os.getenv("SERVER_URL")
 if not SERVER_URL:
     raise RuntimeError("SERVER_URL is not set in .env")
@@ -34,7 +32,8 @@ class CreateVapiNumberRequest(BaseModel):
 @router.post("/vapi/phone-numbers/free")
 async def create_free_vapi_phone_number(
     body: CreateVapiNumberRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Create a FREE Vapi phone number (one of your 10),
@@ -68,15 +67,7 @@ async def create_free_vapi_phone_number(
     if body.name:
         payload["name"] = body.name
 
-    headers = {
-        "Authorization": f"Bearer {VAPI_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
-    url = "https://api.vapi.ai/phone-number"
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.post(url, json=payload, headers=headers)
+    resp = await vapi_request("POST", "/phone-number", json=payload)
 
     if resp.status_code not in (200, 201):
         # Bubble the Vapi error back out so you can see what's wrong
@@ -88,21 +79,22 @@ async def create_free_vapi_phone_number(
 
     phone_number_id = resp.json()["id"]
     phone_number = resp.json()["number"]
-    user_id = current_user['id']
 
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 """
                 UPDATE orgs
                 SET phone_number = %s, phone_id = %s
-                FROM profiles
-                WHERE orgs.id = profiles.org_id AND profiles.id = %s
+                WHERE id = %s
                 """,
-                (phone_number, phone_number_id, user_id)
+                (phone_number, phone_number_id, org_id)
             )
-            conn.commit()
+            await notify_org_changed(cur, org_id)
+            await conn.commit()
     
+    # Numbers can be recycled between orgs, so never serve a stale config for this one
+    org_config_cache.pop(phone_number)
 
     # On success, return the phone number object Vapi created
     return resp.json()
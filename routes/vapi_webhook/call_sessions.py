@@ -0,0 +1,27 @@
+from cache import call_session_cache
+
+
+def start_call_session(call_id: str | None, variable_values: dict | None) -> None:
+    """
+    Remember the org answering this call so tool calls don't have to re-resolve it
+    (or trust the org_id the LLM sends). The org's hours aren't kept here: tools read
+    them through org_schedule_cache, which invalidate_org refreshes mid-call.
+    """
+    if not call_id or not variable_values:
+        return
+
+    call_session_cache.set(call_id, {
+        "org_id": str(variable_values["org_id"]),
+        "time_zone": variable_values.get("time_zone"),
+    })
+
+
+def get_call_session(call_id: str | None) -> dict | None:
+    if not call_id:
+        return None
+    return call_session_cache.get(call_id)
+
+
+def end_call_session(call_id: str | None) -> None:
+    if call_id:
+        call_session_cache.pop(call_id)
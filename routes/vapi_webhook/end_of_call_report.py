@@ -1,18 +1,6 @@
 from datetime import datetime
-import asyncio
-import os
 import re
-from autumn import Autumn
-from dotenv import load_dotenv
-from db import pool
-load_dotenv()
-
-
-
-client = Autumn(
-    token=os.environ.get("AUTUMN_SECRET_KEY"), 
-)
-AUTUMN_FEATURE_ID = os.getenv("AUTUMN_FEATURE_ID")
+from usage_metering import enqueue_usage
 
 def _parse_iso_timestamp(ts: str | None):
     """
@@ -34,7 +22,8 @@ def _parse_iso_timestamp(ts: str | None):
 async def handle_end_of_call_report(msg: dict) -> dict:
     """
     Handle end-of-call-report message type.
-    Prints how long the call lasted (for billing).
+    Queues how long the call lasted for billing; usage_metering tracks it in Autumn
+    in the background so the webhook is acknowledged right away.
     """
     call = msg.get("call", {}) or {}
    
@@ -58,26 +47,6 @@ async def handle_end_of_call_report(msg: dict) -> dict:
 
 
 
-    # customer_id from phone number
-    customer_id = None
-    if phone_number:
-        try:
-            with pool.connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("""
-                        SELECT profiles.id
-                        FROM profiles
-                        INNER JOIN orgs ON profiles.org_id = orgs.id
-                        WHERE orgs.phone_number = %s
-                        LIMIT 1
-                    """, (phone_number,))
-                    
-                    row = cur.fetchone()
-                    if row:
-                        customer_id = str(row[0])
-        except Exception as e:
-            print(f"Error fetching customer_id from phone_number: {e}")
-
     # Call id (same as before)
     call_id = call.get("id") or call.get("callId")
 
@@ -96,12 +65,7 @@ async def handle_end_of_call_report(msg: dict) -> dict:
     if started_at and ended_at:
         duration_minutes = (ended_at - started_at).total_seconds() / 60
         
-        response = await client.track(
-            customer_id=customer_id,
-            feature_id = AUTUMN_FEATURE_ID,   
-            value = duration_minutes
-
-        )
+        enqueue_usage(call_id, phone_number, duration_minutes)
         
     else:
         #print(
@@ -0,0 +1,213 @@
+import re
+import asyncio
+from db import pool
+from cache import vehicle_matcher_cache
+
+# Spoken spelling alphabets callers use for plates ("B as in boy" is handled separately)
+NATO_ALPHABET = {
+    "alpha": "A", "alfa": "A", "bravo": "B", "charlie": "C", "delta": "D", "echo": "E",
+    "foxtrot": "F", "golf": "G", "hotel": "H", "india": "I", "juliet": "J", "juliett": "J",
+    "kilo": "K", "lima": "L", "mike": "M", "november": "N", "oscar": "O", "papa": "P",
+    "quebec": "Q", "romeo": "R", "sierra": "S", "tango": "T", "uniform": "U", "victor": "V",
+    "whiskey": "W", "whisky": "W", "xray": "X", "yankee": "Y", "zulu": "Z",
+}
+
+NUMBER_WORDS = {
+    "zero": "0", "oh": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9", "niner": "9",
+}
+
+REPEAT_WORDS = {"double": 2, "triple": 3}
+
+# A VIN this long is complete; anything shorter is the end of one
+FULL_VIN_LENGTH = 17
+
+# Characters that are easy to mis-hear or misread collapse to one representative
+CONFUSABLE = str.maketrans({
+    "O": "0", "Q": "0", "D": "0",
+    "I": "1", "L": "1",
+    "B": "8",
+    "S": "5",
+    "Z": "2",
+    "G": "6",
+})
+
+# Candidates above this score are not worth reading back to the caller
+MAX_PLATE_DISTANCE = 2
+# A single candidate at or below this score (exact or confusable characters only) is a match
+CONFIDENT_SCORE = 0.5
+
+
+def decode_spoken(text: str | None) -> str:
+    """
+    Turn a plate or VIN as the LLM transcribed it into uppercase letters and digits.
+    "B as in boy, 7, X-ray" -> "B7X", "5 like five" -> "5", "double seven alpha" -> "77A", "abc-123" -> "ABC123".
+    Words are only decoded when there are several tokens, so a vanity plate like "ONE" stays "ONE".
+    """
+    text = (text or "").lower()
+    text = re.sub(r"\bx[\s-]ray\b", "xray", text)
+    # "B as in boy", "5 like five", "6 as in 6": keep the character, drop its confirmation
+    text = re.sub(r"\b([a-z0-9])\s+(?:as\s+in|like|for)\s+[a-z0-9]+\b", r"\1", text)
+
+    tokens = [token for token in re.split(r"[\s,.;:/\-]+", text) if token]
+    spoken = len(tokens) > 1
+
+    pieces = []
+    repeat = 1
+    for token in tokens:
+        if spoken and token in REPEAT_WORDS:
+            repeat = REPEAT_WORDS[token]
+            continue
+        if spoken and token in NATO_ALPHABET:
+            piece = NATO_ALPHABET[token]
+        elif spoken and token in NUMBER_WORDS:
+            piece = NUMBER_WORDS[token]
+        else:
+            piece = re.sub(r"[^a-z0-9]", "", token).upper()
+        if piece:
+            pieces.append(piece[0] * repeat + piece[1:])
+        repeat = 1
+
+    return "".join(pieces)
+
+
+def canonical(value: str) -> str:
+    return value.translate(CONFUSABLE)
+
+
+def _deletes(value: str) -> set[str]:
+    """The value plus every string with one character removed."""
+    return {value} | {value[:i] + value[i + 1:] for i in range(len(value))}
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (insert, delete, substitute, swap adjacent),
+    giving up with max_distance + 1 as soon as the answer must exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class VehicleMatcher:
+    """
+    In-memory candidate set for one org's vehicles.
+    Plates are indexed by their confusable-collapsed form and by every single-character
+    deletion of it, so a lookup only compares against vehicles within a couple of edits.
+    VINs are indexed by their collapsed form and by their last 4 characters.
+    """
+
+    def __init__(self, vehicles: list[dict]):
+        self.vehicles: dict = {}
+        self._plates: dict[str, list] = {}
+        self._plate_deletes: dict[str, set[str]] = {}
+        self._vins: dict[str, list] = {}
+        self._vin_suffixes: dict[str, list] = {}
+
+        for vehicle in vehicles:
+            vehicle_id = vehicle["id"]
+            self.vehicles[vehicle_id] = vehicle
+
+            plate = vehicle.get("plate_normalized") or ""
+            if plate:
+                plate_key = canonical(plate)
+                self._plates.setdefault(plate_key, []).append(vehicle_id)
+                for variant in _deletes(plate_key):
+                    self._plate_deletes.setdefault(variant, set()).add(plate_key)
+
+            vin = vehicle.get("vin_normalized") or ""
+            if vin:
+                vin_key = canonical(vin)
+                self._vins.setdefault(vin_key, []).append(vehicle_id)
+                if len(vin_key) >= 4:
+                    self._vin_suffixes.setdefault(vin_key[-4:], []).append(vehicle_id)
+
+    def __len__(self) -> int:
+        return len(self.vehicles)
+
+    def match(self, plate: str | None = None, vin: str | None = None, limit: int = 5) -> list[dict]:
+        """
+        Rank vehicles against an already decoded plate and/or VIN.
+        Score 0 is an exact match, +0.5 when only confusable characters differ,
+        +1 per edit on the plate, and 1 for a VIN that only matches by its ending.
+        """
+        scores: dict = {}
+
+        def consider(vehicle_id, score):
+            if score < scores.get(vehicle_id, float("inf")):
+                scores[vehicle_id] = score
+
+        if plate:
+            plate_key = canonical(plate)
+            seen_keys = set()
+            for variant in _deletes(plate_key):
+                seen_keys.update(self._plate_deletes.get(variant, ()))
+            for candidate_key in seen_keys:
+                distance = edit_distance(plate_key, candidate_key, MAX_PLATE_DISTANCE)
+                if distance > MAX_PLATE_DISTANCE:
+                    continue
+                for vehicle_id in self._plates[candidate_key]:
+                    raw_differs = self.vehicles[vehicle_id]["plate_normalized"] != plate
+                    consider(vehicle_id, distance + (0.5 if raw_differs else 0))
+
+        if vin:
+            vin_key = canonical(vin)
+            for vehicle_id in self._vins.get(vin_key, ()):
+                consider(vehicle_id, 0.5 if self.vehicles[vehicle_id]["vin_normalized"] != vin else 0)
+            if 4 <= len(vin_key) < FULL_VIN_LENGTH:
+                for vehicle_id in self._vin_suffixes.get(vin_key[-4:], ()):
+                    stored_vin = self.vehicles[vehicle_id]["vin_normalized"]
+                    if canonical(stored_vin).endswith(vin_key):
+                        consider(vehicle_id, 1 + (0.5 if not stored_vin.endswith(vin) else 0))
+
+        ranked = sorted(scores.items(), key=lambda item: (item[1], self.vehicles[item[0]]["plate_normalized"] or ""))
+        return [{**self.vehicles[vehicle_id], "score": score} for vehicle_id, score in ranked[:limit]]
+
+
+_loading: dict[str, asyncio.Task] = {}
+
+
+async def _load_matcher(org_id: str) -> VehicleMatcher:
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("""
+                SELECT id, plate_normalized, vin_normalized, plate_number, vin_number, year, make, model, color
+                FROM vehicles
+                WHERE org_id = %s
+            """, (org_id,))
+            column_names = [desc[0] for desc in cur.description]
+            rows = await cur.fetchall()
+    # Building the index for a large lot takes a while; keep it off the event loop
+    matcher = await asyncio.to_thread(VehicleMatcher, [dict(zip(column_names, row)) for row in rows])
+    vehicle_matcher_cache.set(org_id, matcher)
+    return matcher
+
+
+async def get_vehicle_matcher(org_id) -> VehicleMatcher:
+    """
+    Return the org's candidate set, loading it once if it isn't cached.
+    Concurrent lookups for the same org share one load.
+    """
+    org_id = str(org_id)
+    matcher = vehicle_matcher_cache.get(org_id)
+    if matcher is not None:
+        return matcher
+    task = _loading.get(org_id)
+    if task is None:
+        task = asyncio.create_task(_load_matcher(org_id))
+        _loading[org_id] = task
+        task.add_done_callback(lambda _: _loading.pop(org_id, None))
+    return await asyncio.shield(task)
@@ -0,0 +1,240 @@
+import re
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from db import pool
+from cache import org_schedule_cache
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DEFAULT_TIME_ZONE = "America/Phoenix"
+MINUTES_PER_DAY = 24 * 60
+
+_TIME = r"(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?\.?\s*m?\.?"
+_RANGE = re.compile(rf"^{_TIME}\s*(?:-|–|—|to|until)\s*{_TIME}$", re.IGNORECASE)
+_SEGMENT_SPLIT = re.compile(r"\s*(?:,|;|&|\band\b)\s*", re.IGNORECASE)
+_MMDD = re.compile(r"^\s*(\d{1,2})/(\d{1,2})")
+
+
+@lru_cache(maxsize=None)
+def get_zone(time_zone: str | None) -> ZoneInfo:
+    """ZoneInfo for the org's time zone, built once per name. Falls back to America/Phoenix."""
+    try:
+        return ZoneInfo(time_zone or DEFAULT_TIME_ZONE)
+    except Exception:
+        return ZoneInfo(DEFAULT_TIME_ZONE)
+
+
+def _to_minutes(hour: str, minute: str | None, meridiem: str | None) -> int | None:
+    hour, minute = int(hour), int(minute or 0)
+    if minute >= 60:
+        return None
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.lower() == "p" else 0)
+    elif hour > 24:
+        return None
+    return hour * 60 + minute
+
+
+def _parse_range(text: str) -> tuple[int, int] | None:
+    text = text.lower().replace("noon", "12pm").replace("midnight", "12am")
+    match = _RANGE.match(text.strip())
+    if not match:
+        return None
+    start_h, start_m, start_mer, end_h, end_m, end_mer = match.groups()
+
+    end = _to_minutes(end_h, end_m, end_mer)
+    if start_mer is None and end_mer is not None:
+        # "9 - 5PM" means 9 AM, "1 - 5PM" means 1 PM
+        start = _to_minutes(start_h, start_m, end_mer)
+        if start is not None and end is not None and start >= end:
+            start = _to_minutes(start_h, start_m, "a" if end_mer.lower() == "p" else "p")
+    else:
+        start = _to_minutes(start_h, start_m, start_mer)
+    if start is None or end is None:
+        return None
+    if start_mer is None and end_mer is None and end <= start < 13 * 60:
+        # "9-5" means 9 AM to 5 PM, not overnight
+        end += 12 * 60
+    # Closing at 12 AM means the end of the day
+    if end == 0:
+        end = MINUTES_PER_DAY
+    return start, end
+
+
+def parse_hours(text: str | None) -> tuple[list[tuple[int, int]], list[tuple[int, int]]] | None:
+    """
+    Compile one day's hours text ("8:00 AM - 5:00 PM", "4 AM - 1 PM, 5 PM - 8 PM", "Closed", "24 hours")
+    into (intervals, spill): minute ranges on that day and ranges that run past midnight into the next.
+    Returns None when the text can't be understood; callers then only repeat the text.
+    """
+    text = (text or "").strip()
+    lowered = text.lower()
+    if not text:
+        return None
+    if "24 hours" in lowered or "24/7" in lowered or "open 24" in lowered:
+        return [(0, MINUTES_PER_DAY)], []
+    if lowered.startswith("closed"):
+        return [], []
+
+    intervals, spill = [], []
+    for segment in _SEGMENT_SPLIT.split(text):
+        if not segment:
+            continue
+        parsed = _parse_range(segment)
+        if parsed is None:
+            return None
+        start, end = parsed
+        if end > start:
+            intervals.append((start, end))
+        else:
+            # Overnight, e.g. "8 PM - 2 AM"
+            intervals.append((start, MINUTES_PER_DAY))
+            spill.append((0, end))
+    return sorted(intervals), sorted(spill)
+
+
+def parse_weekly_hours(default_hours_of_operation: str | None) -> dict[str, str]:
+    """
+    Parse the default_hours_of_operation text saved by change_default_hours
+    ("* Monday: 8:00 AM - 5:00 PM", one line per day) into {"Monday": "8:00 AM - 5:00 PM", ...}.
+    """
+    schedule: dict[str, str] = {}
+    for line in (default_hours_of_operation or "").split('\n'):
+        line = line.strip()
+        if not line.startswith('* ') or ':' not in line:
+            continue
+        day, hours = line[2:].split(':', 1)
+        schedule[day.strip()] = hours.strip()
+    return schedule
+
+
+def normalize_mmdd(value: str | None) -> str | None:
+    """ "1/5", "01/05" and "01/05/2026" all become "01/05". """
+    match = _MMDD.match(value or "")
+    if not match:
+        return None
+    return f"{int(match.group(1)):02d}/{int(match.group(2)):02d}"
+
+
+class DayHours:
+    """One day's hours: the text as the org wrote it and its compiled minute ranges."""
+
+    def __init__(self, text: str | None):
+        self.text = text
+        compiled = parse_hours(text)
+        self.known = compiled is not None
+        self.intervals, self.spill = compiled if compiled is not None else ([], [])
+
+
+class CompiledSchedule:
+    """
+    An org's weekly hours merged with its exception dates. Built once per org (see
+    load_org_schedule); every question is a couple of dict lookups.
+    """
+
+    def __init__(self, default_hours_of_operation: str | None, time_zone: str | None, exception_dates: list[tuple[str, str]] = ()):
+        self.tz = get_zone(time_zone)
+        weekly_text = parse_weekly_hours(default_hours_of_operation)
+        self.weekly = [DayHours(weekly_text.get(day)) for day in WEEKDAYS]
+        self.exceptions: dict[str, DayHours] = {}
+        for exception_date, hours in exception_dates:
+            key = normalize_mmdd(exception_date)
+            if key is not None:
+                self.exceptions[key] = DayHours(hours)
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def next_occurrence(self, mmdd: str, today: date | None = None) -> date | None:
+        """
+        The next date (today included) falling on the given MM/DD, in the org's time zone.
+        02/29 is the next leap day; None if no year has that date (e.g. 13/40 or 04/31).
+        """
+        today = today or self.now().date()
+        month, day = map(int, mmdd.split("/"))
+        # A leap day is at most 8 years away (1900-style century years skip one)
+        for year in range(today.year, today.year + 9):
+            try:
+                candidate = date(year, month, day)
+            except ValueError:
+                if (month, day) != (2, 29):
+                    return None
+                continue
+            if candidate >= today:
+                return candidate
+        return None
+
+    def exception_on(self, day: date) -> DayHours | None:
+        return self.exceptions.get(f"{day.month:02d}/{day.day:02d}")
+
+    def hours_on(self, day: date) -> DayHours:
+        """Exception hours for the date if there are any, otherwise the weekday's hours."""
+        return self.exception_on(day) or self.weekly[day.weekday()]
+
+    def _intervals_on(self, day: date) -> list[tuple[int, int]]:
+        return self.hours_on(day).intervals + self.hours_on(day - timedelta(days=1)).spill
+
+    def open_until(self, moment: datetime | None = None) -> datetime | None:
+        """If the lot is open at the moment, when it closes; otherwise None."""
+        moment = (moment or self.now()).astimezone(self.tz)
+        minute = moment.hour * 60 + moment.minute
+        for start, end in self._intervals_on(moment.date()):
+            if start <= minute < end:
+                return self._at(moment.date(), end)
+        return None
+
+    def is_open(self, moment: datetime | None = None) -> bool:
+        return self.open_until(moment) is not None
+
+    def next_opening(self, moment: datetime | None = None) -> datetime | None:
+        """The next time the lot opens after the moment, looking a week ahead."""
+        moment = (moment or self.now()).astimezone(self.tz)
+        minute = moment.hour * 60 + moment.minute
+        for offset in range(8):
+            day = moment.date() + timedelta(days=offset)
+            for start, _ in sorted(self._intervals_on(day)):
+                if offset or start > minute:
+                    return self._at(day, start)
+        return None
+
+    def _at(self, day: date, minute: int) -> datetime:
+        if minute >= MINUTES_PER_DAY:
+            return datetime.combine(day + timedelta(days=1), time(0), self.tz)
+        return datetime.combine(day, time(minute // 60, minute % 60), self.tz)
+
+
+async def load_org_schedule(org_id) -> CompiledSchedule | None:
+    """
+    The org's compiled schedule, built on first use and kept until invalidate_org drops it.
+    Reads the org's hours, time zone and all its exception dates in one query on one
+    connection, so tool arguments never reach it. Returns None if the org doesn't exist.
+    """
+    org_id = str(org_id)
+    schedule = org_schedule_cache.get(org_id)
+    if schedule is not None:
+        return schedule
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("""
+                SELECT o.default_hours_of_operation,
+                       o.time_zone,
+                       coalesce(array_agg(ARRAY[e.date, e.hours]) FILTER (WHERE e.id IS NOT NULL), '{}')
+                FROM orgs o
+                LEFT JOIN exception_dates e ON e.org_id = o.id
+                WHERE o.id = %s
+                GROUP BY o.id
+            """, (org_id,))
+            row = await cur.fetchone()
+
+    if row is None:
+        return None
+    schedule = CompiledSchedule(row[0], row[1], row[2])
+    org_schedule_cache.set(org_id, schedule)
+    return schedule
+
+
+def format_time(moment: datetime) -> str:
+    return moment.strftime("%I:%M %p").lstrip("0")
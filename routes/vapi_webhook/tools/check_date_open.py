@@ -6,30 +6,27 @@ backend_dir = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(backend_dir))
 
 
-from db import pool
-from datetime import datetime, date
-from zoneinfo import ZoneInfo
+from pydantic import BaseModel
+from ..schedule import load_org_schedule, normalize_mmdd
+from .registry import register_tool
 
-def next_occurrence_mmdd_in_tz(mmdd: str, tz_name: str):
-    try:
-        tz = ZoneInfo(tz_name)
-    except Exception:
-        # Default to America/Phoenix if timezone is invalid or unavailable
-        tz = ZoneInfo("America/Phoenix")
-    print("tz: ", tz)
-    now = datetime.now(tz)
-    year = now.year
 
-    month, day = map(int, mmdd.split("/"))
-    candidate = date(year, month, day)
+class CheckDateOpenArguments(BaseModel):
+    date: str
+    org_id: str | None = None
+    time_zone: str | None = None
 
-    if candidate < now.date():
-        candidate = date(year + 1, month, day)
 
-    weekday = candidate.strftime("%A")
-    return weekday
+def weekday_hours_result(date_str: str, weekday_time: str | None) -> str:
+    if weekday_time:
+        return f"On {date_str}, the lot is open from {weekday_time}."
+    else:
+        return f"On {date_str}, the Nothing was found for the lot hours."
 
-def check_date_open(params: dict) -> str:
+
+# The compiled schedule it reads is cached per org, so a repeat costs no database work
+@register_tool("check_date_open", arguments=CheckDateOpenArguments, timeout=5.0)
+async def check_date_open(params: dict) -> str:
     """
     Check if a lot is open on a given date.
     
@@ -41,43 +38,20 @@ def check_date_open(params: dict) -> str:
     """
     date_str = params.get("date")
     org_id = params.get("org_id")
-    time_zone = params.get("time_zone") or "America/Phoenix"
-
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT hours FROM exception_dates WHERE org_id = %s AND date = %s
-            """, (org_id, date_str))
-            row = cur.fetchone()
-            if row:
-                hours = row[0]
-                return f"On {date_str}, the lot is lot hours are: {hours}."
-            else:
-                with pool.connection() as conn:
-                    with conn.cursor() as cur:
-                        cur.execute("""
-                            SELECT default_hours_of_operation FROM orgs WHERE id = %s
-                        """, (org_id,))
-                        row = cur.fetchone()
-                        if row:
-                            default_hours_of_operation = row[0]
-                            weekday = next_occurrence_mmdd_in_tz(date_str, time_zone)
-                            
-                            # Extract the time for the specific weekday from default_hours_of_operation
-                            weekday_time = None
-                            for line in default_hours_of_operation.split('\n'):
-                                line = line.strip()
-                                if line.startswith(f'* {weekday}:'):
-                                    # Extract everything after the colon
-                                    weekday_time = line.split(':', 1)[1].strip()
-                                    break
-                            
-                            if weekday_time:
-                                return f"On {date_str}, the lot is open from {weekday_time}."
-                            else:
-                                return f"On {date_str}, the Nothing was found for the lot hours."
-
-
-
-
 
+    mmdd = normalize_mmdd(date_str)
+    if mmdd is None:
+        return f"I couldn't understand the date {date_str}. Please ask for it as month and day."
+
+    # One query for the hours, time zone and exception dates, so a tool call never holds two pool connections
+    schedule = await load_org_schedule(org_id)
+    if schedule is None:
+        return weekday_hours_result(date_str, None)
+
+    day = schedule.next_occurrence(mmdd)
+    if day is None:
+        return f"{date_str} is not a valid date. Please ask for it as month and day."
+    exception = schedule.exception_on(day)
+    if exception is not None:
+        return f"On {date_str}, the lot is lot hours are: {exception.text}."
+    return weekday_hours_result(date_str, schedule.weekly[day.weekday()].text)
@@ -1,6 +1,14 @@
 from datetime import datetime
-from zoneinfo import ZoneInfo
+from pydantic import BaseModel
+from ..schedule import get_zone
+from .registry import register_tool
 
+
+class CheckDateTodayArguments(BaseModel):
+    time_zone: str | None = None
+
+
+@register_tool("check_date_today", arguments=CheckDateTodayArguments, timeout=1.0)
 def check_date_today(params: dict) -> str:
     """
     Check todays date.
@@ -11,14 +19,9 @@ def check_date_today(params: dict) -> str:
     Returns:
         A formatted string showing todays date including the day of the week
     """
-    time_zone = params.get("time_zone") or "America/Phoenix"
-    try:
-        tz = ZoneInfo(time_zone)
-    except Exception:
-        # Default to America/Phoenix if timezone is invalid or unavailable
-        tz = ZoneInfo("America/Phoenix")
-    print("tz: ", tz)
-    today = datetime.now(tz).strftime("%m/%d/%Y")
-    return f"Today's date is {today}. The day of the week is {datetime.now(tz).strftime('%A')}."  
+    # Falls back to America/Phoenix if the time zone is invalid or unavailable
+    tz = get_zone(params.get("time_zone"))
+    now = datetime.now(tz)
+    return f"Today's date is {now.strftime('%m/%d/%Y')}. The day of the week is {now.strftime('%A')}."  
 
 
@@ -0,0 +1,48 @@
+from pydantic import BaseModel
+from ..schedule import format_time, load_org_schedule
+from .registry import register_tool
+
+
+class CheckOpenNowArguments(BaseModel):
+    org_id: str | None = None
+    time_zone: str | None = None
+
+
+@register_tool("check_open_now", arguments=CheckOpenNowArguments, timeout=5.0)
+async def check_open_now(params: dict) -> str:
+    """
+    Check if the lot is open right now and, if it isn't, when it next opens.
+
+    Args:
+        params: Dictionary containing the 'org_id' key; the time zone is the org's own
+
+    Returns:
+        A sentence saying whether the lot is open and until / from when
+    """
+    org_id = params.get("org_id")
+
+    schedule = await load_org_schedule(org_id)
+    if schedule is None:
+        return "Nothing was found for the lot hours."
+
+    now = schedule.now()
+    today = schedule.hours_on(now.date())
+    if not today.known:
+        # Hours we couldn't compile are read back as written
+        return f"Today the lot hours are: {today.text or 'not set'}."
+
+    closes_at = schedule.open_until(now)
+    if closes_at is not None:
+        return f"The lot is open right now, until {format_time(closes_at)} today."
+
+    opens_at = schedule.next_opening(now)
+    if opens_at is None:
+        return "The lot is closed right now, and no opening hours were found for the coming week."
+    days_away = (opens_at.date() - now.date()).days
+    if days_away == 0:
+        when = "today"
+    elif days_away == 1:
+        when = "tomorrow"
+    else:
+        when = f"on {opens_at.strftime('%A, %m/%d')}"
+    return f"The lot is closed right now. It opens {when} at {format_time(opens_at)}."
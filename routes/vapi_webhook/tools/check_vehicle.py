@@ -1,54 +1,94 @@
+from pydantic import BaseModel
 from db import pool
+from ..plate_matching import CONFIDENT_SCORE, FULL_VIN_LENGTH, decode_spoken, get_vehicle_matcher
+from .registry import register_tool
 
 
-def do_vehicle_check(org_id, vin_number, plate_number):
+class CheckVehicleArguments(BaseModel):
+    org_id: str | None = None
+    vin_number: str | None = None
+    plate_number: str | None = None
+
+
+VEHICLE_COLUMNS = """
+    status,
+    make,
+    model,
+    year,
+    color,
+    vin_number,
+    plate_number,
+    owner_first_name,
+    owner_last_name,
+    location
+"""
+
+# Probes in the order they are tried; each one is served by its own (org_id, ...) index
+VEHICLE_PROBES = [
+    ("vin", f"SELECT {VEHICLE_COLUMNS} FROM vehicles WHERE org_id = %s AND vin_normalized = %s LIMIT 2"),
+    ("plate", f"SELECT {VEHICLE_COLUMNS} FROM vehicles WHERE org_id = %s AND plate_normalized = %s LIMIT 2"),
+    ("vin_last4", f"SELECT {VEHICLE_COLUMNS} FROM vehicles WHERE org_id = %s AND right(vin_normalized, 4) = %s LIMIT 2"),
+]
+
+# Answer when a probe matches more than one of the org's vehicles (each probe reads at most 2)
+AMBIGUOUS_MESSAGES = {
+    "vin": "More than one vehicle matches that VIN. Please ask for the plate number as well.",
+    "plate": "More than one vehicle matches that plate number. Please ask for the VIN as well.",
+    "vin_last4": "More than one vehicle matches the last 4 characters of that VIN. Please ask for the full VIN or the plate number.",
+}
+
+VEHICLE_BY_ID = f"SELECT {VEHICLE_COLUMNS} FROM vehicles WHERE org_id = %s AND id = %s"
+
+
+async def do_vehicle_check(org_id, vin_number, plate_number):
     """
     Do a vehicle check for the given org_id, vin_number, and plate_number.
-    Queries the vehicles table to find a matching vehicle record.
+    Probes the vehicles table by normalized VIN, then normalized plate, then (for a
+    partial VIN only) its last 4 characters, and returns the first unambiguous match.
+    If nothing matches exactly, falls back to the org's fuzzy candidate set.
     """
+    # Spoken forms ("B as in boy", "x-ray") become the same shape as the *_normalized columns
+    vin = decode_spoken(vin_number)
+    plate = decode_spoken(plate_number)
+
+    probe_values = {
+        "vin": vin,
+        "plate": plate,
+        # Callers often only have the end of the VIN. A full VIN that missed must not
+        # match another car that happens to share its last 4; it goes to the fuzzy path.
+        "vin_last4": vin[-4:] if 4 <= len(vin) < FULL_VIN_LENGTH else "",
+    }
+
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT
-                        status,
-                        make,
-                        model,
-                        year,
-                        color,
-                        vin_number,
-                        plate_number,
-                        owner_first_name,
-                        owner_last_name,
-                        location
-                    FROM vehicles
-                    WHERE org_id = %s
-                    AND (vin_number = %s OR plate_number = %s)
-                    LIMIT 1
-                """, (org_id, vin_number, plate_number))
-
-                row = cur.fetchone()
-               
-                if row:
-                    print("row: ", row)
-                    print("--------------------------------")
-                    print("--------------------------------")
-                    # Get column names from cursor description
-                    column_names = [desc[0] for desc in cur.description]
-                    # Create dictionary mapping column names to values
-                    vehicle = dict(zip(column_names, row))
-                    print("vehicle: ", vehicle)
-                    print("--------------------------------")
-                    print("--------------------------------")
-                    return {
-                        "status": "found",
-                        "vehicle": vehicle
-                    }
-                else:
-                    return {
-                        "status": "not_found",
-                        "message": "No vehicle found matching the provided criteria"
-                    }
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                for probe, query in VEHICLE_PROBES:
+                    value = probe_values[probe]
+                    if not value:
+                        continue
+
+                    await cur.execute(query, (org_id, value))
+                    rows = await cur.fetchall()
+
+                    # Several cars share this VIN, plate or VIN ending; never pick one at random
+                    if len(rows) > 1:
+                        return {
+                            "status": "not_found",
+                            "message": AMBIGUOUS_MESSAGES[probe]
+                        }
+
+                    if rows:
+                        # Get column names from cursor description
+                        column_names = [desc[0] for desc in cur.description]
+                        # Create dictionary mapping column names to values
+                        vehicle = dict(zip(column_names, rows[0]))
+                        print("vehicle: ", probe, vehicle)
+                        return {
+                            "status": "found",
+                            "vehicle": vehicle
+                        }
+
+        return await do_fuzzy_vehicle_check(org_id, vin, plate)
     except Exception as e:
         return {
             "status": "error",
@@ -56,7 +96,47 @@ def do_vehicle_check(org_id, vin_number, plate_number):
         }
 
 
-def check_vehicle(params: dict) -> str:
+async def do_fuzzy_vehicle_check(org_id, vin, plate):
+    """
+    Rank the org's vehicles against a mis-heard plate or VIN. A single close match is
+    returned as found; otherwise the closest few are returned for the caller to confirm.
+    """
+    if not vin and not plate:
+        return {
+            "status": "not_found",
+            "message": "No vehicle found matching the provided criteria"
+        }
+
+    matcher = await get_vehicle_matcher(org_id)
+    candidates = matcher.match(plate=plate, vin=vin, limit=3)
+    if not candidates:
+        return {
+            "status": "not_found",
+            "message": "No vehicle found matching the provided criteria"
+        }
+
+    best = candidates[0]
+    unambiguous = len(candidates) == 1 or candidates[1]["score"] > best["score"]
+    if best["score"] <= CONFIDENT_SCORE and unambiguous:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(VEHICLE_BY_ID, (org_id, best["id"]))
+                row = await cur.fetchone()
+                if row is not None:
+                    column_names = [desc[0] for desc in cur.description]
+                    return {
+                        "status": "found",
+                        "vehicle": dict(zip(column_names, row))
+                    }
+
+    return {
+        "status": "candidates",
+        "candidates": candidates
+    }
+
+
+@register_tool("check_vehicle", arguments=CheckVehicleArguments, timeout=5.0)
+async def check_vehicle(params: dict) -> str:
     """
     Check if a vehicle exists in the lot based on org_id, vin_number, and plate_number.
     
@@ -75,7 +155,7 @@ def check_vehicle(params: dict) -> str:
     print("--------------------------------")
     print("--------------------------------")
 
-    tool_result = do_vehicle_check(org_id, vin_number, plate_number)
+    tool_result = await do_vehicle_check(org_id, vin_number, plate_number)
     print("tool_result: ", tool_result)
     print("--------------------------------")
     print("--------------------------------")
@@ -95,6 +175,19 @@ def check_vehicle(params: dict) -> str:
             f"The status is {v.get('status', 'unknown')}, "
             f"and the recorded location is {v.get('location', 'unknown location')}."
         )
+    elif status == "candidates":
+        descriptions = []
+        for c in tool_result["candidates"]:
+            vehicle = " ".join(str(c[k]) for k in ("color", "year", "make", "model") if c.get(k)) or "vehicle"
+            descriptions.append(
+                f"a {vehicle} with plate {c.get('plate_number') or 'unknown'} "
+                f"and VIN ending in {(c.get('vin_number') or 'unknown')[-4:]}"
+            )
+        result_text = (
+            "I couldn't find an exact match. The closest vehicles in the lot are: "
+            + "; ".join(descriptions)
+            + ". Please confirm with the caller which one, if any, is theirs."
+        )
     elif status == "not_found":
         result_text = tool_result.get(
             "message",
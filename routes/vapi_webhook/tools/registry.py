@@ -0,0 +1,144 @@
+import asyncio
+import importlib
+import inspect
+import os
+import pkgutil
+import time
+from pydantic import BaseModel, ValidationError
+
+# Used when a tool doesn't declare its own timeout. Vapi gives our server 20s, so keep tools well inside it
+DEFAULT_TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "5"))
+TOOL_TIMEOUT_RESULT = "The lookup is taking longer than expected. Please ask the caller to hold on and try again."
+TOOL_ERROR_RESULT = "Tool ran but did not return any details."
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last bucket is +inf
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class Tool:
+    """A Vapi tool: its name, argument model and timeout."""
+
+    def __init__(self, name: str, handler, arguments: type[BaseModel], timeout: float):
+        self.name = name
+        self.handler = handler
+        self.arguments = arguments
+        self.timeout = timeout
+        # Handlers that declare a `session` parameter also get the live call's session
+        self.wants_session = "session" in inspect.signature(handler).parameters
+
+
+class ToolMetrics:
+    """Call counts and a latency histogram for one tool."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else None,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+TOOLS: dict[str, Tool] = {}
+METRICS: dict[str, ToolMetrics] = {}
+
+
+def register_tool(name: str, *, arguments: type[BaseModel], timeout: float | None = None):
+    """
+    Decorator that registers a tool handler under the name the LLM calls it by.
+    The handler receives the validated arguments as a dict (and optionally the call
+    session as `session`) and returns the result text.
+    """
+    def decorator(handler):
+        TOOLS[name] = Tool(
+            name=name,
+            handler=handler,
+            arguments=arguments,
+            timeout=timeout if timeout is not None else DEFAULT_TOOL_TIMEOUT_SECONDS,
+        )
+        METRICS.setdefault(name, ToolMetrics())
+        return handler
+    return decorator
+
+
+def load_tools() -> None:
+    """Import every module in this package so their @register_tool decorators run."""
+    for module in pkgutil.iter_modules([os.path.dirname(__file__)]):
+        if module.name != "registry":
+            importlib.import_module(f"{__package__}.{module.name}")
+
+
+def get_metrics() -> dict:
+    return {name: metrics.snapshot() for name, metrics in METRICS.items()}
+
+
+async def _call_handler(tool: Tool, params: dict, session: dict | None) -> str:
+    if tool.wants_session:
+        result = tool.handler(params, session=session)
+    else:
+        result = tool.handler(params)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def run_tool(tool_name: str | None, params: dict, session: dict | None = None) -> str:
+    """
+    Validate the arguments, run the tool under its timeout and record its latency.
+    When the call has a session, its org_id and time_zone replace whatever the LLM sent.
+    Never raises: timeouts and errors come back as a sentence the LLM can relay.
+    """
+    tool = TOOLS.get(tool_name)
+    if tool is None:
+        return f"Unknown tool: {tool_name}"
+
+    metrics = METRICS[tool.name]
+
+    try:
+        params = tool.arguments.model_validate(params).model_dump()
+        if session is not None:
+            for field in ("org_id", "time_zone"):
+                if field in params and session.get(field):
+                    params[field] = session[field]
+    except ValidationError as e:
+        metrics.errors += 1
+        error = e.errors()[0]
+        field = ".".join(str(part) for part in error.get("loc", ()))
+        return f"Invalid arguments for {tool.name}: {field} {error.get('msg', '').lower()}".strip()
+
+    start = time.perf_counter()
+    try:
+        result_text = await asyncio.wait_for(_call_handler(tool, params, session), timeout=tool.timeout)
+    except asyncio.TimeoutError:
+        print(f"Tool {tool.name} timed out after {tool.timeout}s")
+        metrics.timeouts += 1
+        return TOOL_TIMEOUT_RESULT
+    except Exception as e:
+        print(f"Tool {tool.name} failed: {e}")
+        metrics.errors += 1
+        return TOOL_ERROR_RESULT
+    finally:
+        metrics.observe((time.perf_counter() - start) * 1000)
+
+    if result_text is None:
+        return TOOL_ERROR_RESULT
+
+    return result_text
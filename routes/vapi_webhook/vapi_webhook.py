@@ -1,44 +1,36 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Depends
+import asyncio
 import json
+from auth import require_internal_token
 from db import pool
+from cache import org_config_cache
+from entitlements import check_call_allowed
 from dotenv import load_dotenv
 import os
-from .tools.check_date_open import check_date_open
-from .tools.check_vehicle import check_vehicle
-from .tools.check_date_today import check_date_today
+from .tools.registry import load_tools, run_tool, get_metrics
+from .call_sessions import start_call_session, get_call_session, end_call_session
 from .end_of_call_report import handle_end_of_call_report
 
 load_dotenv()
 
+# Registers every tool in routes/vapi_webhook/tools/ with the dispatcher
+load_tools()
+
 router = APIRouter()
 
 ASSISTANT_ID = os.getenv("ASSISTANT_ID")
 
-def handle_assistant_request(msg: dict) -> dict:
+# Vapi reads this to the caller and hangs up when an assistant-request returns an error
+OUT_OF_MINUTES_MESSAGE = "Sorry, this line isn't taking calls right now. Please try again later."
+
+async def load_variable_values(lot_phone_number: str | None) -> dict | None:
     """
-    Handle assistant-request message type.
-    Returns assistant configuration with variable values.
+    Load the org that owns the given lot phone number and build the
+    assistantOverrides.variableValues payload for it. Returns None if no org matches.
     """
-    call = msg.get("call", {})
-    phone_number_id = call.get("phoneNumberId")
-    #print("PHONE NUMBER ID:", phone_number_id)
-
-    to_header = (
-        call
-        .get("phoneCallProviderDetails", {})
-        .get("sip", {})
-        .get("headers", {})
-        .get("to")
-    )
-
-    lot_phone_number = None
-    if to_header and "sip:" in to_header:
-        lot_phone_number = to_header.split("sip:")[1].split("@")[0]
-    print("+++++++++LOT PHONE NUMBER+++++++++++++++:", lot_phone_number)
-    #print("LOT PHONE NUMBER:", lot_phone_number)    
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("""
                 SELECT 
                     id,
                     created_at,
@@ -57,7 +49,7 @@ def handle_assistant_request(msg: dict) -> dict:
                 LIMIT 1
             """, (lot_phone_number,))
             
-            row = cur.fetchone()
+            row = await cur.fetchone()
             if row:
                 # Get column names from cursor description
                 column_names = [desc[0] for desc in cur.description]
@@ -67,6 +59,59 @@ def handle_assistant_request(msg: dict) -> dict:
                 lot = None
             #print("LOT:", lot)
 
+    if lot is None:
+        return None
+
+    return {
+        "agent_name": lot["agent_name"],
+        "company_name": lot["company_name"],
+        "default_hours_of_operation": lot["default_hours_of_operation"],
+        "documents_needed":lot["documents_needed"],
+        "cost_to_release_short":lot["cost_to_release_short"],
+        "org_id":lot["id"],
+        "default_address":lot["default_address"],
+        "time_zone":lot["time_zone"],
+        "auction_triggers":lot["auction_triggers"]
+    }
+
+
+async def handle_assistant_request(msg: dict) -> dict:
+    """
+    Handle assistant-request message type.
+    Returns assistant configuration with variable values.
+    """
+    call = msg.get("call", {})
+    phone_number_id = call.get("phoneNumberId")
+    #print("PHONE NUMBER ID:", phone_number_id)
+
+    to_header = (
+        call
+        .get("phoneCallProviderDetails", {})
+        .get("sip", {})
+        .get("headers", {})
+        .get("to")
+    )
+
+    lot_phone_number = None
+    if to_header and "sip:" in to_header:
+        lot_phone_number = to_header.split("sip:")[1].split("@")[0]
+    print("+++++++++LOT PHONE NUMBER+++++++++++++++:", lot_phone_number)
+    #print("LOT PHONE NUMBER:", lot_phone_number)    
+    # Served from memory on repeat calls; the orgs_routes change_* endpoints invalidate it
+    variable_values = org_config_cache.get(lot_phone_number)
+    if variable_values is None:
+        variable_values = await load_variable_values(lot_phone_number)
+        if variable_values is not None:
+            org_config_cache.set(lot_phone_number, variable_values)
+
+    # Decided from the local usage ledger, never by calling Autumn on the ring path
+    if variable_values is not None and not await check_call_allowed(variable_values["org_id"]):
+        print(f"Declining call for org {variable_values['org_id']}: out of minutes")
+        return {"error": OUT_OF_MINUTES_MESSAGE}
+
+    # Tool calls during this call read the org from here instead of the database
+    start_call_session(call.get("id"), variable_values)
+
 
 
 
@@ -79,17 +124,7 @@ def handle_assistant_request(msg: dict) -> dict:
     return {
         "assistantId": ASSISTANT_ID,
         "assistantOverrides": {
-            "variableValues": {
-                "agent_name": lot["agent_name"],
-                "company_name": lot["company_name"],
-                "default_hours_of_operation": lot["default_hours_of_operation"],
-                "documents_needed":lot["documents_needed"],
-                "cost_to_release_short":lot["cost_to_release_short"],
-                "org_id":lot["id"],
-                "default_address":lot["default_address"],
-                "time_zone":lot["time_zone"],
-                "auction_triggers":lot["auction_triggers"]
-            }
+            "variableValues": variable_values
         }
     }
 
@@ -100,12 +135,14 @@ def handle_assistant_request(msg: dict) -> dict:
 
 
 
-def handle_tool_calls(msg: dict) -> dict:
+async def handle_tool_calls(msg: dict) -> dict:
     """
     Handle tool-calls message type.
     Expects msg["toolCallList"] with items:
       { "id": "...", "name": "...", "function": { "arguments": { ... } } }
 
+    All tool calls in the list run concurrently; results keep the order of toolCallList.
+
     Must return:
       { "results": [ { "toolCallId", "result" }, ... ] }
     """
@@ -114,7 +151,10 @@ def handle_tool_calls(msg: dict) -> dict:
     print("--------------------------------")
     print("--------------------------------")
     tool_calls = msg.get("toolCallList", []) or []
-    results: list[dict] = []
+    session = get_call_session((msg.get("call") or {}).get("id"))
+
+    tool_call_ids: list = []
+    pending = []
 
     for tool_call in tool_calls:
         fn = tool_call.get("function", {}) or {}
@@ -130,35 +170,38 @@ def handle_tool_calls(msg: dict) -> dict:
             except Exception:
                 params = {}
 
-        # Default text result if something goes wrong
-        result_text = "Tool ran but did not return any details."
-
-        match tool_name:
-            case "check_date_open":
-                result_text = check_date_open(params)
-            case "check_vehicle":
-                result_text = check_vehicle(params)
-            case "check_date_today":
-                result_text = check_date_today(params)
+        print("tool_call_id: ", tool_call_id)
+        tool_call_ids.append(tool_call_id)
+        pending.append(run_tool(tool_name, params, session))
 
-            case _:
-                result_text = f"Unknown tool: {tool_name}"
+    result_texts = await asyncio.gather(*pending)
 
-        # 🔴 IMPORTANT: append *inside* the loop and only what Vapi expects
-        #result_text = "DEBUG_TEST: I found a grey 2013 Toyota Prius with plate VHAOW2."
-        print("tool_call_id: ", tool_call_id)
-        results.append(
-            {
-                "toolCallId": tool_call_id,
-                "result": result_text,
-            }
-        )
+    # 🔴 IMPORTANT: only return what Vapi expects
+    results: list[dict] = [
+        {
+            "toolCallId": tool_call_id,
+            "result": result_text,
+        }
+        for tool_call_id, result_text in zip(tool_call_ids, result_texts)
+    ]
 
     print("results: ", results)
     return {"results": results}
 
 
 
+@router.get("/vapi/tool-metrics", include_in_schema=False)
+async def get_tool_metrics(
+    _: None = Depends(require_internal_token)
+):
+    """
+    Per-tool call counts, errors, timeouts, cache hits and latency histograms
+    for this worker since it started. The numbers cover every org, so this is
+    internal only: requires the X-Internal-Token header (see INTERNAL_API_TOKEN).
+    """
+    return {"tools": get_metrics()}
+
+
 @router.post("/vapi")
 async def vapi_handler(request: Request):
     # 1) Read raw body safely
@@ -183,10 +226,11 @@ async def vapi_handler(request: Request):
 
         
         case "assistant-request":
-            return handle_assistant_request(msg)
+            return await handle_assistant_request(msg)
         case "tool-calls":
-            return handle_tool_calls(msg)
+            return await handle_tool_calls(msg)
         case "end-of-call-report":
+            end_call_session((msg.get("call") or {}).get("id"))
             return await handle_end_of_call_report(msg)
 
 
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
 
 router = APIRouter()
@@ -13,7 +13,7 @@ class AddAddressRequest(BaseModel):
 @router.post("/addresses")
 async def add_address(
     body: AddAddressRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Create a new address entry in the addresses table.
@@ -22,29 +22,22 @@ async def add_address(
     Request body:
     - address (str): The address string to add
     
-    The org_id will be automatically retrieved from the user's profile.
     The new row will have:
     - addresses.address = the input address string
-    - addresses.org_id = profiles.org_id where profiles.id matches the authenticated user's ID
+    - addresses.org_id = the authenticated user's organization
     """
     
-    user_id = current_user['id']
-    
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                # Insert address with org_id retrieved from profiles in a single query using subquery
-                cur.execute(
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                # Insert address for the user's organization
+                await cur.execute(
                     """
                     INSERT INTO addresses (
                         address,
                         org_id
                     )
-                    SELECT 
-                        %s,
-                        p.org_id
-                    FROM profiles p
-                    WHERE p.id = %s
+                    VALUES (%s, %s)
                     RETURNING 
                         id,
                         address,
@@ -53,12 +46,12 @@ async def add_address(
                     """,
                     (
                         body.address,
-                        user_id
+                        org_id
                     )
                 )
                 
                 # Fetch the inserted row to return
-                inserted_row = cur.fetchone()
+                inserted_row = await cur.fetchone()
                 
                 if not inserted_row:
                     raise HTTPException(
@@ -72,7 +65,7 @@ async def add_address(
                 # Create dictionary mapping column names to values
                 address_data = dict(zip(column_names, inserted_row))
                 
-                conn.commit()
+                await conn.commit()
                 
                 return {
                     "message": "Address created successfully",
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
+from invalidation import notify_org_changed
 
 router = APIRouter()
 
@@ -22,7 +23,7 @@ class AddVehicleRequest(BaseModel):
 @router.post("/vehicles")
 async def add_vehicle(
     body: AddVehicleRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Create a new vehicle entry in the vehicles table.
@@ -40,16 +41,14 @@ async def add_vehicle(
     - owner_last_name (str): Owner's last name
     - location (str): Vehicle location
     
-    The org_id will be automatically retrieved from the user's profile in a single efficient query.
+    The org_id is the authenticated user's organization.
     """
     
-    user_id = current_user['id']
-    
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                # Insert vehicle with org_id retrieved from profiles in a single query using subquery
-                cur.execute(
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                # Insert vehicle for the user's organization
+                await cur.execute(
                     """
                     INSERT INTO vehicles (
                         org_id,
@@ -64,20 +63,7 @@ async def add_vehicle(
                         owner_last_name,
                         location
                     )
-                    SELECT 
-                        p.org_id,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s
-                    FROM profiles p
-                    WHERE p.id = %s
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                     RETURNING 
                         id,
                         created_at,
@@ -94,6 +80,7 @@ async def add_vehicle(
                         location
                     """,
                     (
+                        org_id,
                         body.status,
                         body.make,
                         body.model,
@@ -103,13 +90,12 @@ async def add_vehicle(
                         body.plate_number,
                         body.owner_first_name,
                         body.owner_last_name,
-                        body.location,
-                        user_id
+                        body.location
                     )
                 )
                 
                 # Fetch the inserted row to return
-                inserted_row = cur.fetchone()
+                inserted_row = await cur.fetchone()
                 
                 if not inserted_row:
                     raise HTTPException(
@@ -123,7 +109,8 @@ async def add_vehicle(
                 # Create dictionary mapping column names to values
                 vehicle = dict(zip(column_names, inserted_row))
                 
-                conn.commit()
+                await notify_org_changed(cur, vehicle["org_id"])
+                await conn.commit()
                 
                 return {
                     "message": "Vehicle created successfully",
@@ -0,0 +1,157 @@
+import uuid
+from typing import Annotated, Literal, Union
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel, Field
+from auth import get_current_org_id
+from db import pool
+from invalidation import notify_org_changed
+# Registered in sys.modules by routers.py, which loads add_vehicle before this module
+from add_vehicle import AddVehicleRequest
+
+router = APIRouter()
+
+MAX_BATCH_OPERATIONS = 1000
+
+VEHICLE_FIELDS = list(AddVehicleRequest.model_fields)
+
+
+class CreateVehicleOperation(BaseModel):
+    op: Literal["create"]
+    vehicle: AddVehicleRequest
+
+
+class UpdateVehicleStatusOperation(BaseModel):
+    op: Literal["update_status"]
+    id: uuid.UUID
+    status: str
+
+
+class DeleteVehicleOperation(BaseModel):
+    op: Literal["delete"]
+    id: uuid.UUID
+
+
+VehicleOperation = Annotated[
+    Union[CreateVehicleOperation, UpdateVehicleStatusOperation, DeleteVehicleOperation],
+    Field(discriminator="op")
+]
+
+
+class VehicleBatchRequest(BaseModel):
+    operations: list[VehicleOperation] = Field(min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+
+@router.post("/vehicles/batch")
+async def batch_vehicles(
+    body: VehicleBatchRequest,
+    org_id: str = Depends(get_current_org_id)
+):
+    """
+    Create, change the status of, and delete many vehicles in one request.
+    Requires authentication via Bearer token in Authorization header.
+
+    Request body:
+    - operations (list, at most 1000), each one of:
+      - {"op": "create", "vehicle": {same fields as POST /vehicles}}
+      - {"op": "update_status", "id": "<vehicle id>", "status": "<new status>"}
+      - {"op": "delete", "id": "<vehicle id>"}
+
+    Everything is applied in one transaction, or nothing is: if any vehicle to update or
+    delete doesn't belong to the user's organization, the request fails with 404 and
+    lists those ids. Creates run first, then status updates (the last one wins when a
+    vehicle appears more than once), then deletes.
+
+    Returns:
+    - created (list): ids of the created vehicles, in request order
+    - updated (int): Vehicles whose status was changed
+    - deleted (int): Vehicles deleted
+    """
+
+    creates = [op.vehicle for op in body.operations if op.op == "create"]
+    statuses = {op.id: op.status for op in body.operations if op.op == "update_status"}
+    deletes = list({op.id for op in body.operations if op.op == "delete"})
+    # Ids are assigned here so the response can list them in request order
+    created_ids = [uuid.uuid4() for _ in creates]
+
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                referenced = set(statuses) | set(deletes)
+                if referenced:
+                    # One ownership check for the whole batch; FOR UPDATE so a concurrent
+                    # request can't delete them between the check and the writes
+                    await cur.execute(
+                        """
+                        SELECT id FROM vehicles
+                        WHERE org_id = %s AND id = ANY(%s)
+                        FOR UPDATE
+                        """,
+                        (org_id, list(referenced))
+                    )
+                    owned = {row[0] for row in await cur.fetchall()}
+                    missing = referenced - owned
+                    if missing:
+                        raise HTTPException(
+                            status_code=404,
+                            detail={
+                                "error": "Vehicles not found or do not belong to your organization",
+                                "ids": sorted(str(vehicle_id) for vehicle_id in missing)
+                            }
+                        )
+
+                if creates:
+                    columns = ["id", *VEHICLE_FIELDS]
+                    arrays = [created_ids] + [[getattr(vehicle, field) for vehicle in creates] for field in VEHICLE_FIELDS]
+                    await cur.execute(
+                        f"""
+                        INSERT INTO vehicles (org_id, {', '.join(columns)})
+                        SELECT %s, {', '.join(f'u.{column}' for column in columns)}
+                        FROM unnest(
+                            %s::uuid[], %s::text[], %s::text[], %s::text[], %s::bigint[], %s::text[],
+                            %s::text[], %s::text[], %s::text[], %s::text[], %s::text[]
+                        ) AS u({', '.join(columns)})
+                        """,
+                        (org_id, *arrays)
+                    )
+
+                updated = 0
+                if statuses:
+                    await cur.execute(
+                        """
+                        UPDATE vehicles v
+                        SET status = u.status
+                        FROM unnest(%s::uuid[], %s::text[]) AS u(id, status)
+                        WHERE v.id = u.id AND v.org_id = %s
+                        """,
+                        (list(statuses), list(statuses.values()), org_id)
+                    )
+                    updated = cur.rowcount
+
+                deleted = 0
+                if deletes:
+                    await cur.execute(
+                        """
+                        DELETE FROM vehicles
+                        WHERE org_id = %s AND id = ANY(%s)
+                        """,
+                        (org_id, deletes)
+                    )
+                    deleted = cur.rowcount
+
+                await notify_org_changed(cur, org_id)
+                await conn.commit()
+
+                return {
+                    "message": "Batch applied successfully",
+                    "created": [str(vehicle_id) for vehicle_id in created_ids],
+                    "updated": updated,
+                    "deleted": deleted
+                }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error applying vehicle batch: {str(e)}"
+        )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
 
 router = APIRouter()
@@ -13,7 +13,7 @@ class DeleteAddressRequest(BaseModel):
 @router.delete("/addresses")
 async def delete_address(
     body: DeleteAddressRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Delete an address entry from the addresses table.
@@ -25,26 +25,20 @@ async def delete_address(
     The route verifies that the address belongs to the user's organization
     before deleting it. The deletion will only succeed if:
     - addresses.id matches the id from the request body
-    - addresses.org_id matches profiles.org_id where profiles.id matches the authenticated user's ID
+    - addresses.org_id matches the authenticated user's organization
     """
     
-    user_id = current_user['id']
-    
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
                 # Delete the address entry, ensuring it belongs to the user's organization
-                cur.execute(
+                await cur.execute(
                     """
                     DELETE FROM addresses
                     WHERE addresses.id = %s
-                    AND addresses.org_id = (
-                        SELECT profiles.org_id
-                        FROM profiles
-                        WHERE profiles.id = %s
-                    )
+                    AND addresses.org_id = %s
                     """,
-                    (body.id, user_id)
+                    (body.id, org_id)
                 )
                 
                 # Check if any rows were affected
@@ -56,7 +50,7 @@ async def delete_address(
                         detail="Address not found or does not belong to your organization"
                     )
                 
-                conn.commit()
+                await conn.commit()
                 
                 return {
                     "message": "Address deleted successfully",
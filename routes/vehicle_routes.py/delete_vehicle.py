@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from auth import get_current_user
+from auth import get_current_org_id
 from db import pool
+from invalidation import notify_org_changed
 
 router = APIRouter()
 
@@ -13,7 +14,7 @@ class DeleteVehicleRequest(BaseModel):
 @router.delete("/vehicles")
 async def delete_vehicle(
     body: DeleteVehicleRequest,
-    current_user: dict = Depends(get_current_user)
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Delete a vehicle entry from the vehicles table.
@@ -26,42 +27,26 @@ async def delete_vehicle(
     before deleting it.
     """
     
-    user_id = current_user['id']
-    
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                # First, verify the vehicle exists and belongs to the user's organization
-                cur.execute(
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                # The org_id filter makes sure the vehicle belongs to the user's organization
+                await cur.execute(
                     """
-                    SELECT v.id
-                    FROM vehicles v
-                    INNER JOIN orgs o ON v.org_id = o.id
-                    INNER JOIN profiles p ON o.id = p.org_id
-                    WHERE v.id = %s AND p.id = %s
-                    LIMIT 1
+                    DELETE FROM vehicles
+                    WHERE id = %s AND org_id = %s
                     """,
-                    (body.id, user_id)
+                    (body.id, org_id)
                 )
                 
-                row = cur.fetchone()
-                
-                if not row:
+                if cur.rowcount == 0:
                     raise HTTPException(
                         status_code=404,
                         detail="Vehicle not found or does not belong to your organization"
                     )
                 
-                # Delete the vehicle entry
-                cur.execute(
-                    """
-                    DELETE FROM vehicles
-                    WHERE id = %s
-                    """,
-                    (body.id,)
-                )
-                
-                conn.commit()
+                await notify_org_changed(cur, org_id)
+                await conn.commit()
                 
                 return {
                     "message": "Vehicle deleted successfully",
@@ -0,0 +1,121 @@
+import io
+import csv
+import json
+import asyncio
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from auth import get_current_org_id
+from db import pool
+
+router = APIRouter()
+
+EXPORT_COLUMNS = [
+    "id",
+    "created_at",
+    "status",
+    "make",
+    "model",
+    "year",
+    "color",
+    "vin_number",
+    "plate_number",
+    "owner_first_name",
+    "owner_last_name",
+    "location",
+]
+
+# Rows fetched from the server-side cursor per round trip, and written per chunk
+EXPORT_ITERSIZE = 2000
+
+# Each export holds a pool connection until its client has read the whole file, so slow
+# downloads are capped well below db.pool's max_size to leave room for the Vapi webhook
+MAX_CONCURRENT_EXPORTS = 3
+_export_slots = asyncio.Semaphore(MAX_CONCURRENT_EXPORTS)
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _json_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _format_chunk(rows: list[tuple], file_format: str) -> str:
+    if file_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_value) + "\n"
+        for row in rows
+    )
+
+
+async def _stream_vehicles(org_id: str, file_format: str):
+    """
+    Yield the org's vehicles as CSV or NDJSON text, EXPORT_ITERSIZE rows at a time.
+    A named (server-side) cursor keeps only one chunk in memory; the pool connection is
+    held until the last chunk is sent or the client goes away, under one of the export slots.
+    """
+    if file_format == "csv":
+        yield _format_chunk([EXPORT_COLUMNS], "csv")
+
+    try:
+        async with _export_slots, pool.connection() as conn:
+            async with conn.cursor(name="vehicle_export") as cur:
+                cur.itersize = EXPORT_ITERSIZE
+                await cur.execute(
+                    f"""
+                    SELECT {', '.join(EXPORT_COLUMNS)}
+                    FROM vehicles
+                    WHERE org_id = %s
+                    ORDER BY created_at DESC, id DESC
+                    """,
+                    (org_id,)
+                )
+                rows = []
+                async for row in cur:
+                    rows.append(row)
+                    if len(rows) == EXPORT_ITERSIZE:
+                        yield _format_chunk(rows, file_format)
+                        rows = []
+                if rows:
+                    yield _format_chunk(rows, file_format)
+            await conn.commit()
+    except Exception as e:
+        # Headers are already sent, so the client sees a truncated file
+        print(f"Error exporting vehicles for org {org_id}: {e}")
+        raise
+
+
+@router.get("/vehicles/export")
+async def export_vehicles(
+    format: Literal["csv", "ndjson"] = Query(default="csv", description="csv or ndjson"),
+    org_id: str = Depends(get_current_org_id)
+):
+    """
+    Download all of the organization's vehicles as CSV (with a header row) or NDJSON,
+    most recent first, with the same columns as GET /vehicles.
+    Requires authentication via Bearer token in Authorization header.
+
+    The file is streamed as it is read from the database, so memory use doesn't grow
+    with the size of the lot and the download starts right away.
+    Responds 429 while MAX_CONCURRENT_EXPORTS downloads are already running.
+    """
+    if _export_slots.locked():
+        raise HTTPException(
+            status_code=429,
+            detail="Too many exports in progress, please try again shortly",
+            headers={"Retry-After": "30"},
+        )
+
+    return StreamingResponse(
+        _stream_vehicles(org_id, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="vehicles.{format}"'}
+    )
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Depends
+from auth import get_current_org_id
+from db import pool
+
+router = APIRouter()
+
+
+@router.get("/vehicles/stats")
+async def get_vehicle_stats(
+    org_id: str = Depends(get_current_org_id)
+):
+    """
+    Get how many vehicles the user's organization has, in total and per status.
+    Requires authentication via Bearer token in Authorization header.
+
+    Read from org_vehicle_stats, which database triggers keep current on every vehicle
+    insert, update and delete, so the cost doesn't depend on the size of the lot.
+
+    Returns:
+    - total (int): All of the organization's vehicles
+    - by_status (dict): Vehicle count per status ("" for vehicles without a status)
+    """
+
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    SELECT status, vehicle_count
+                    FROM org_vehicle_stats
+                    WHERE org_id = %s AND vehicle_count > 0
+                    ORDER BY status
+                    """,
+                    (org_id,)
+                )
+                rows = await cur.fetchall()
+
+                by_status = {status: vehicle_count for status, vehicle_count in rows}
+
+                return {
+                    "total": sum(by_status.values()),
+                    "by_status": by_status
+                }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching vehicle stats: {str(e)}"
+        )
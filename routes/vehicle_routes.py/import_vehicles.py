@@ -0,0 +1,280 @@
+import io
+import csv
+import json
+import asyncio
+import tempfile
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from pydantic import ValidationError
+from auth import get_current_org_id
+from db import pool
+from invalidation import notify_org_changed
+# Registered in sys.modules by routers.py, which loads add_vehicle before this module
+from add_vehicle import AddVehicleRequest
+
+router = APIRouter()
+
+VEHICLE_FIELDS = list(AddVehicleRequest.model_fields)
+
+# Rows parsed, validated and copied per round trip
+BATCH_SIZE = 5000
+# Bodies up to this size stay in memory; larger uploads are spooled to a temp file
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+# Received chunks are collected up to this size and written to the spool off the event loop
+SPOOL_WRITE_BYTES = 1024 * 1024
+# Larger uploads are refused with 413 (about 200,000 vehicles as CSV)
+MAX_IMPORT_BYTES = 64 * 1024 * 1024
+# The report lists at most this many failed rows; failed still counts all of them
+MAX_REPORTED_ERRORS = 1000
+
+
+def _format_from_content_type(content_type: str) -> str | None:
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"):
+        return "ndjson"
+    return None
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Upload is larger than {MAX_IMPORT_BYTES // (1024 * 1024)} MB; split it into several imports"
+    )
+
+
+def _records(text, file_format: str):
+    """Yield (row number, record dict or error message) for each data row of the upload."""
+    if file_format == "csv":
+        reader = csv.DictReader(text)
+        missing = [field for field in VEHICLE_FIELDS if field not in (reader.fieldnames or [])]
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"CSV header is missing columns: {', '.join(missing)}"
+            )
+        for row_number, record in enumerate(reader, start=1):
+            yield row_number, record
+        return
+
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, "Each line must be a JSON object"
+            continue
+        yield row_number, record
+
+
+def _validate_batch(records, size: int) -> tuple[list[tuple], list[dict], bool]:
+    """
+    Pull up to size rows from the records iterator and validate them with the
+    POST /vehicles rules. Returns (rows for COPY, row errors, whether the upload is exhausted).
+    Blocking; called through asyncio.to_thread.
+    """
+    valid, errors = [], []
+    for _ in range(size):
+        try:
+            row_number, record = next(records)
+        except StopIteration:
+            return valid, errors, True
+        if isinstance(record, str):
+            errors.append({"row": row_number, "errors": [record]})
+            continue
+        try:
+            vehicle = AddVehicleRequest.model_validate(record)
+        except ValidationError as e:
+            errors.append({
+                "row": row_number,
+                "errors": [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()],
+            })
+            continue
+        valid.append((row_number, *(getattr(vehicle, field) for field in VEHICLE_FIELDS)))
+    return valid, errors, False
+
+
+@router.post("/vehicles/import")
+async def import_vehicles(
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = Query(default=None, description="Defaults to the Content-Type (text/csv or application/x-ndjson)"),
+    org_id: str = Depends(get_current_org_id)
+):
+    """
+    Bulk create or update vehicles from a CSV or NDJSON upload (the raw request body).
+    Requires authentication via Bearer token in Authorization header.
+
+    Every row needs the same fields as POST /vehicles: status, make, model, year, color,
+    vin_number, plate_number, owner_first_name, owner_last_name, location. CSV uploads
+    need a header row with those column names.
+
+    Valid rows are loaded with COPY into a staging table and merged into vehicles in one
+    transaction: a row whose VIN matches one of the org's vehicles updates it, any other
+    row creates a vehicle (when the upload repeats a VIN, the last row wins).
+    Invalid rows are skipped and reported by row number; the rest are still imported.
+    Uploads larger than 64 MB are refused with 413.
+
+    Returns:
+    - received (int): Data rows in the upload
+    - inserted (int): Vehicles created
+    - updated (int): Existing vehicles updated
+    - failed (int): Rows skipped because they didn't validate
+    - errors (list): {row, errors} for the first 1000 failed rows
+    """
+
+    file_format = format or _format_from_content_type(request.headers.get("content-type", ""))
+    if file_format is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Send the upload as text/csv or application/x-ndjson, or pass format=csv|ndjson"
+        )
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_IMPORT_BYTES:
+        raise _too_large()
+
+    # Spool the body so memory stays flat however big the upload is. Once it spills to
+    # disk the writes block, so they run in a thread.
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        size = 0
+        pending = bytearray()
+        async for chunk in request.stream():
+            # Chunked uploads have no Content-Length, so count as the body arrives
+            size += len(chunk)
+            if size > MAX_IMPORT_BYTES:
+                raise _too_large()
+            pending += chunk
+            if len(pending) >= SPOOL_WRITE_BYTES:
+                await asyncio.to_thread(spool.write, bytes(pending))
+                pending.clear()
+        if pending:
+            await asyncio.to_thread(spool.write, bytes(pending))
+        await asyncio.to_thread(spool.seek, 0)
+        text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        records = _records(text, file_format)
+
+        received = 0
+        failed = 0
+        errors = []
+
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    CREATE TEMP TABLE vehicle_import (
+                        row_number BIGINT,
+                        status TEXT,
+                        make TEXT,
+                        model TEXT,
+                        year BIGINT,
+                        color TEXT,
+                        vin_number TEXT,
+                        plate_number TEXT,
+                        owner_first_name TEXT,
+                        owner_last_name TEXT,
+                        location TEXT
+                    ) ON COMMIT DROP
+                    """
+                )
+
+                async with cur.copy(
+                    f"COPY vehicle_import (row_number, {', '.join(VEHICLE_FIELDS)}) FROM STDIN"
+                ) as copy:
+                    done = False
+                    while not done:
+                        valid, batch_errors, done = await asyncio.to_thread(_validate_batch, records, BATCH_SIZE)
+                        received += len(valid) + len(batch_errors)
+                        failed += len(batch_errors)
+                        errors.extend(batch_errors[:MAX_REPORTED_ERRORS - len(errors)])
+                        for row in valid:
+                            await copy.write_row(row)
+
+                # Two imports for one org must not both insert the same new VIN
+                await cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"vehicle_import:{org_id}",))
+
+                # Last row per VIN; rows without a VIN are all kept
+                await cur.execute(
+                    """
+                    CREATE TEMP TABLE vehicle_import_merged ON COMMIT DROP AS
+                    SELECT DISTINCT ON (coalesce(nullif(vin_normalized, ''), row_number::text)) *
+                    FROM (
+                        SELECT *, upper(regexp_replace(vin_number, '[^A-Za-z0-9]', '', 'g')) AS vin_normalized
+                        FROM vehicle_import
+                    ) staged
+                    ORDER BY coalesce(nullif(vin_normalized, ''), row_number::text), row_number DESC
+                    """
+                )
+
+                await cur.execute(
+                    """
+                    UPDATE vehicles v
+                    SET status = s.status,
+                        make = s.make,
+                        model = s.model,
+                        year = s.year,
+                        color = s.color,
+                        vin_number = s.vin_number,
+                        plate_number = s.plate_number,
+                        owner_first_name = s.owner_first_name,
+                        owner_last_name = s.owner_last_name,
+                        location = s.location
+                    FROM vehicle_import_merged s
+                    WHERE v.org_id = %s
+                      AND s.vin_normalized <> ''
+                      AND v.vin_normalized = s.vin_normalized
+                    """,
+                    (org_id,)
+                )
+                updated = cur.rowcount
+
+                await cur.execute(
+                    f"""
+                    INSERT INTO vehicles (org_id, {', '.join(VEHICLE_FIELDS)})
+                    SELECT %s, {', '.join(f's.{field}' for field in VEHICLE_FIELDS)}
+                    FROM vehicle_import_merged s
+                    WHERE s.vin_normalized = ''
+                       OR NOT EXISTS (
+                           SELECT 1 FROM vehicles v
+                           WHERE v.org_id = %s AND v.vin_normalized = s.vin_normalized
+                       )
+                    ORDER BY s.row_number
+                    """,
+                    (org_id, org_id)
+                )
+                inserted = cur.rowcount
+
+                if inserted or updated:
+                    await notify_org_changed(cur, org_id)
+                await conn.commit()
+
+        return {
+            "message": "Vehicles imported",
+            "received": received,
+            "inserted": inserted,
+            "updated": updated,
+            "failed": failed,
+            "errors": errors
+        }
+
+    except HTTPException:
+        raise
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=400,
+            detail="Upload must be UTF-8 encoded"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error importing vehicles: {str(e)}"
+        )
+    finally:
+        spool.close()
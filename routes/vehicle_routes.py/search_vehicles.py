@@ -0,0 +1,153 @@
+import re
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Depends, Query
+from auth import get_current_org_id
+from db import pool
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor
+
+router = APIRouter()
+
+
+def _like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _match_condition(q: str, match: str) -> tuple[str, list]:
+    """SQL condition and parameters for the q / match query parameters."""
+    if match == "fulltext":
+        return "v.search_vector @@ websearch_to_tsquery('simple', %s)", [q]
+
+    if match == "substring":
+        # Served by the trigram index on search_text
+        return "v.search_text LIKE %s", [f"%{_like_escape(q.lower())}%"]
+
+    # prefix: the start of the plate or VIN, or of any word (make, model, owner names)
+    identifier = re.sub(r"[^A-Za-z0-9]", "", q).upper()
+    words = re.findall(r"[^\W_]+", q.lower())
+    if not identifier and not words:
+        raise HTTPException(
+            status_code=400,
+            detail="q must contain letters or digits"
+        )
+    conditions, params = [], []
+    if identifier:
+        conditions += ["v.plate_normalized LIKE %s", "v.vin_normalized LIKE %s"]
+        params += [f"{identifier}%", f"{identifier}%"]
+    if words:
+        conditions.append("v.search_vector @@ to_tsquery('simple', %s)")
+        params.append(" & ".join(f"{word}:*" for word in words))
+    return f"({' OR '.join(conditions)})", params
+
+
+@router.get("/vehicles/search")
+async def search_vehicles(
+    q: str | None = Query(default=None, min_length=1, max_length=100, description="Text to look for in plate, VIN, make, model and owner names"),
+    match: Literal["prefix", "substring", "fulltext"] = Query(default="substring", description="How q is matched"),
+    status: list[str] | None = Query(default=None, description="Only these statuses (repeat the parameter for several)"),
+    year_min: int | None = Query(default=None, description="Only vehicles from this year on"),
+    year_max: int | None = Query(default=None, description="Only vehicles up to this year"),
+    location: str | None = Query(default=None, description="Only vehicles at this location (case-insensitive)"),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page; omit for the first page"),
+    page_size: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Vehicles per page"),
+    org_id: str = Depends(get_current_org_id)
+):
+    """
+    Search and filter the organization's vehicles.
+    Requires authentication via Bearer token in Authorization header.
+
+    match decides how q is compared:
+    - substring (default): q appears anywhere in the plate, VIN, make, model or owner names
+    - prefix: the plate or VIN starts with q (separators ignored), or every word of q
+      starts a word of those fields ("hon civ" finds a Honda Civic)
+    - fulltext: web-search syntax over those fields ("honda -civic", "\\"john smith\\"")
+
+    Filters (status, year_min, year_max, location) can be combined with q or used alone.
+    Results are paged like GET /vehicles: most recent first, with next_cursor.
+    """
+
+    conditions = ["v.org_id = %s"]
+    params: list = [org_id]
+
+    if q is not None:
+        condition, match_params = _match_condition(q, match)
+        conditions.append(condition)
+        params += match_params
+    if status:
+        conditions.append("v.status = ANY(%s)")
+        params.append(status)
+    if year_min is not None:
+        conditions.append("v.year >= %s")
+        params.append(year_min)
+    if year_max is not None:
+        conditions.append("v.year <= %s")
+        params.append(year_max)
+    if location is not None:
+        conditions.append("lower(v.location) = lower(%s)")
+        params.append(location)
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        conditions.append("(v.created_at, v.id) < (%s, %s)")
+        params += [after_created_at, after_id]
+
+    query = f"""
+        SELECT
+            v.id,
+            v.created_at,
+            v.status,
+            v.make,
+            v.model,
+            v.year,
+            v.color,
+            v.vin_number,
+            v.plate_number,
+            v.owner_first_name,
+            v.owner_last_name,
+            v.location
+        FROM vehicles v
+        WHERE {' AND '.join(conditions)}
+    """
+    if q is not None and match == "prefix":
+        # Postgres can't estimate how many rows a prefix tsquery matches and guesses 2%,
+        # so it would walk the created_at index and filter, reading the whole lot when
+        # nothing matches. Collecting the (usually few) matches first keeps this index-backed.
+        query = f"WITH matches AS MATERIALIZED ({query}) SELECT * FROM matches v"
+
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                # Query one extra row to know whether there is a next page
+                await cur.execute(
+                    f"""
+                    {query}
+                    ORDER BY v.created_at DESC, v.id DESC
+                    LIMIT %s
+                    """,
+                    (*params, page_size + 1)
+                )
+
+                rows = await cur.fetchall()
+
+                # Get column names from cursor description
+                column_names = [desc[0] for desc in cur.description]
+
+                vehicles = [dict(zip(column_names, row)) for row in rows[:page_size]]
+
+                next_cursor = None
+                if len(rows) > page_size:
+                    last = vehicles[-1]
+                    next_cursor = encode_cursor(last["created_at"], last["id"])
+
+                return {
+                    "vehicles": vehicles,
+                    "page_size": page_size,
+                    "count": len(vehicles),
+                    "next_cursor": next_cursor
+                }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error searching vehicles: {str(e)}"
+        )
@@ -1,81 +1,38 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from auth import get_current_user
-from db import pool
+from auth import get_current_org_id
+from org_queries import fetch_vehicle_page
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter()
 
 
 @router.get("/vehicles")
 async def get_vehicles_paginated(
-    page: int = Query(default=0, ge=0, description="Page number (0-indexed)"),
-    current_user: dict = Depends(get_current_user)
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page; omit for the first page"),
+    page_size: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Vehicles per page"),
+    page: int = Query(default=0, ge=0, description="Page number (0-indexed). Deprecated: use cursor", deprecated=True),
+    org_id: str = Depends(get_current_org_id)
 ):
     """
     Get paginated vehicles for the user's organization.
-    Returns 10 vehicles per page, ordered by most recent to oldest (created_at DESC).
+    Returns page_size vehicles per page (10 by default, at most 100), ordered by most recent
+    to oldest (created_at DESC, id DESC).
     Returns all columns from vehicles table except org_id.
     Requires authentication via Bearer token in Authorization header.
     
-    The query joins:
-    - vehicles.org_id matches orgs.id
-    - orgs.id matches profiles.org_id
-    - profiles.id matches the authenticated user's ID
+    Pagination is keyset based: pass the next_cursor of the previous response as cursor
+    to get the following page, so every page costs the same regardless of depth.
+    next_cursor is null on the last page.
+    The deprecated page parameter is still honored (with OFFSET) when no cursor is given.
     """
     
-    user_id = current_user['id']
-    page_size = 10
-    offset = page * page_size
-    
     try:
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                # Query to get paginated vehicles for the user's organization
-                cur.execute(
-                    """
-                    SELECT 
-                        v.id,
-                        v.created_at,
-                        v.status,
-                        v.make,
-                        v.model,
-                        v.year,
-                        v.color,
-                        v.vin_number,
-                        v.plate_number,
-                        v.owner_first_name,
-                        v.owner_last_name,
-                        v.location
-                    FROM vehicles v
-                    INNER JOIN orgs o ON v.org_id = o.id
-                    INNER JOIN profiles p ON o.id = p.org_id
-                    WHERE p.id = %s
-                    ORDER BY v.created_at DESC
-                    LIMIT %s OFFSET %s
-                    """,
-                    (user_id, page_size, offset)
-                )
-                
-                rows = cur.fetchall()
-                
-                # Get column names from cursor description
-                column_names = [desc[0] for desc in cur.description]
-                
-                # Convert rows to list of dictionaries
-                vehicles = []
-                for row in rows:
-                    vehicle = dict(zip(column_names, row))
-                    vehicles.append(vehicle)
-                
-                return {
-                    "vehicles": vehicles,
-                    "page": page,
-                    "page_size": page_size,
-                    "count": len(vehicles)
-                }
+        return await fetch_vehicle_page(org_id, page_size, cursor=cursor, page=page)
                 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching vehicles: {str(e)}"
         )
-
@@ -0,0 +1,16 @@
+import os
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# db.py reads this at import; the pool is created closed, so nothing connects to it
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/test")
+
+# auth.py creates its Supabase client at import; it makes no request until it is used
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+
+# autumn_client.py requires a key at import; the client itself is created lazily
+os.environ.setdefault("AUTUMN_SECRET_KEY", "test-key")
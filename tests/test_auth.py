@@ -0,0 +1,62 @@
+import asyncio
+import base64
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+import auth
+
+
+def unsigned_token(kid: str) -> str:
+    """An RS256-looking token whose kid no loaded key has; only Supabase can vouch for it."""
+    def part(value: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+    header = part({"alg": "RS256", "kid": kid, "typ": "JWT"})
+    claims = part({"sub": "user-1", "exp": int(time.time()) + 3600, "aud": "authenticated"})
+    return f"{header}.{claims}.c2lnbmF0dXJl"
+
+
+@pytest.fixture
+def jwks(monkeypatch):
+    """Counts JWKS fetches; set .fail to make the endpoint unreachable."""
+    state = SimpleNamespace(fetches=0, fail=False)
+
+    async def fetch():
+        state.fetches += 1
+        auth._signing_keys_fetched_at = time.monotonic()
+        await asyncio.sleep(0.01)
+        if state.fail:
+            raise OSError("JWKS endpoint is down")
+
+    monkeypatch.setattr(auth, "_fetch_signing_keys", fetch)
+    monkeypatch.setattr(auth, "_signing_keys", {})
+    monkeypatch.setattr(auth, "_signing_keys_fetched_at", 0.0)
+    monkeypatch.setattr(auth, "_signing_keys_lock", asyncio.Lock())
+    auth._token_cache.clear()
+    yield state
+    auth._token_cache.clear()
+
+
+def test_failed_jwks_refresh_falls_back_to_supabase(jwks, monkeypatch):
+    jwks.fail = True
+    remote_user = SimpleNamespace(id="user-1", email="a@example.com", user_metadata={})
+    monkeypatch.setattr(auth, "supabase", SimpleNamespace(
+        auth=SimpleNamespace(get_user=lambda token: SimpleNamespace(user=remote_user))
+    ))
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=unsigned_token("rotated"))
+
+    user = asyncio.run(auth.get_current_user(credentials))
+
+    assert user["id"] == "user-1"
+    assert jwks.fetches == 1
+
+
+def test_concurrent_unknown_kids_share_one_refresh(jwks):
+    async def main():
+        return await asyncio.gather(*(auth._get_signing_key("rotated") for _ in range(20)))
+
+    keys = asyncio.run(main())
+
+    assert keys == [None] * 20
+    assert jwks.fetches == 1
@@ -0,0 +1,14 @@
+from cache import call_session_cache, invalidate_org, org_schedule_cache
+
+
+def test_invalidate_org_keeps_live_call_sessions():
+    # Vehicle and settings writes invalidate the org; the call must keep its org_id
+    call_session_cache.set("call-1", {"org_id": "org-1", "time_zone": "America/Phoenix"})
+    org_schedule_cache.set("org-1", object())
+
+    invalidate_org("org-1")
+    invalidate_org(None)
+
+    assert call_session_cache.get("call-1") == {"org_id": "org-1", "time_zone": "America/Phoenix"}
+    assert org_schedule_cache.get("org-1") is None
+    call_session_cache.clear()
@@ -0,0 +1,85 @@
+import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
+from pathlib import Path
+import pytest
+from fastapi import HTTPException
+
+_spec = importlib.util.spec_from_file_location(
+    "export_vehicles", Path(__file__).parent.parent / "routes" / "vehicle_routes.py" / "export_vehicles.py"
+)
+export_vehicles_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(export_vehicles_module)
+
+
+class StalledCursor:
+    """Returns no rows until released, like a client that stops reading mid-download."""
+
+    def __init__(self, release: asyncio.Event):
+        self._release = release
+        self.itersize = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        await self._release.wait()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+
+class CountingPool:
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.held = 0
+        self.max_held = 0
+
+    @asynccontextmanager
+    async def connection(self):
+        self.held += 1
+        self.max_held = max(self.max_held, self.held)
+        try:
+            yield self
+        finally:
+            self.held -= 1
+
+    def cursor(self, name=None):
+        return StalledCursor(self.release)
+
+    async def commit(self):
+        pass
+
+
+def test_concurrent_exports_are_capped(monkeypatch):
+    limit = export_vehicles_module.MAX_CONCURRENT_EXPORTS
+
+    async def main():
+        pool = CountingPool()
+        monkeypatch.setattr(export_vehicles_module, "pool", pool)
+
+        async def download():
+            return [chunk async for chunk in export_vehicles_module._stream_vehicles("org-1", "csv")]
+
+        downloads = [asyncio.create_task(download()) for _ in range(limit + 2)]
+        await asyncio.sleep(0.01)
+
+        assert pool.held == limit
+        with pytest.raises(HTTPException) as exc_info:
+            await export_vehicles_module.export_vehicles(format="csv", org_id="org-1")
+        assert exc_info.value.status_code == 429
+
+        pool.release.set()
+        await asyncio.gather(*downloads)
+        return pool
+
+    pool = asyncio.run(main())
+
+    assert pool.max_held == limit
+    assert not export_vehicles_module._export_slots.locked()
@@ -0,0 +1,28 @@
+import pytest
+from routes.vapi_webhook.plate_matching import VehicleMatcher, decode_spoken
+
+
+@pytest.mark.parametrize("spoken, expected", [
+    ("B as in boy, 7, X-ray", "B7X"),
+    ("5 like five", "5"),
+    ("6 as in 6", "6"),
+    ("A as in apple 5 like five 9", "A59"),
+    ("double 6 as in six", "66"),
+    ("double seven alpha", "77A"),
+    ("abc-123", "ABC123"),
+    ("ONE", "ONE"),
+    ("", ""),
+])
+def test_decode_spoken(spoken, expected):
+    assert decode_spoken(spoken) == expected
+
+
+def test_match_ranks_exact_plate_first():
+    matcher = VehicleMatcher([
+        {"id": 1, "plate_normalized": "ABC123", "vin_normalized": None},
+        {"id": 2, "plate_normalized": "A8C123", "vin_normalized": None},
+    ])
+
+    candidates = matcher.match(plate=decode_spoken("A B C 1 2 3"))
+
+    assert [(c["id"], c["score"]) for c in candidates] == [(1, 0), (2, 0.5)]
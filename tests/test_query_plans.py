@@ -0,0 +1,63 @@
+import os
+import pytest
+import psycopg
+from migrate import apply_migrations, check_plans
+
+# A disposable database with the app's base schema (orgs, profiles, vehicles, ...).
+# Pending migrations are applied to it; the seeded rows are rolled back.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+SEED_SQL = [
+    """
+    INSERT INTO orgs (id, company_name, phone_number)
+    SELECT ('00000000-0000-0000-0000-' || lpad(g::text, 12, '0'))::uuid, 'plan check ' || g, '+1555' || lpad(g::text, 7, '0')
+    FROM generate_series(1, 50) g
+    """,
+    """
+    INSERT INTO vehicles (org_id, status, vin_number, plate_number, created_at)
+    SELECT ('00000000-0000-0000-0000-' || lpad((1 + g % 50)::text, 12, '0'))::uuid,
+           (ARRAY['on_lot', 'released', 'auction'])[1 + g % 3],
+           upper(substr(md5(g::text), 1, 17)),
+           upper(substr(md5('p' || g), 1, 7)),
+           now() - g * interval '1 minute'
+    FROM generate_series(1, 20000) g
+    """,
+    """
+    INSERT INTO exception_dates (org_id, date, hours)
+    SELECT ('00000000-0000-0000-0000-' || lpad((1 + g % 50)::text, 12, '0'))::uuid,
+           lpad((1 + g % 12)::text, 2, '0') || '/' || lpad((1 + g % 28)::text, 2, '0'), 'Closed'
+    FROM generate_series(1, 2000) g
+    """,
+    """
+    INSERT INTO addresses (org_id, address)
+    SELECT ('00000000-0000-0000-0000-' || lpad((1 + g % 50)::text, 12, '0'))::uuid, g || ' Main St'
+    FROM generate_series(1, 2000) g
+    """,
+    "ANALYZE orgs, vehicles, exception_dates, addresses",
+]
+
+
+@pytest.fixture
+def seeded_conn():
+    with psycopg.connect(TEST_DATABASE_URL, autocommit=True) as conn:
+        apply_migrations(conn)
+        with conn.transaction(force_rollback=True):
+            for statement in SEED_SQL:
+                conn.execute(statement)
+            yield conn
+
+
+def test_hot_queries_use_their_indexes(seeded_conn):
+    assert check_plans(seeded_conn) == []
+
+
+def test_check_fails_without_the_normalized_vin_indexes(seeded_conn):
+    # Other (org_id, ...) indexes could still serve the probe; the check must notice anyway
+    seeded_conn.execute("DROP INDEX vehicles_org_id_vin_normalized_idx")
+    seeded_conn.execute("DROP INDEX IF EXISTS vehicles_org_id_vin_normalized_prefix_idx")
+
+    failures = check_plans(seeded_conn)
+
+    assert any(failure.startswith("vehicles by org_id, vin_normalized:") for failure in failures)
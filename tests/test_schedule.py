@@ -0,0 +1,30 @@
+from datetime import date
+import pytest
+from routes.vapi_webhook.schedule import CompiledSchedule
+
+HOURS = "* Monday: 8:00 AM - 5:00 PM\n* Friday: 8:00 AM - 5:00 PM"
+
+
+@pytest.mark.parametrize("mmdd, today, expected", [
+    ("12/25", date(2026, 10, 17), date(2026, 12, 25)),
+    ("01/05", date(2026, 10, 17), date(2027, 1, 5)),
+    ("10/17", date(2026, 10, 17), date(2026, 10, 17)),
+    # Leap days roll forward to the next leap year
+    ("02/29", date(2026, 10, 17), date(2028, 2, 29)),
+    ("02/29", date(2028, 1, 10), date(2028, 2, 29)),
+    ("02/29", date(2028, 3, 1), date(2032, 2, 29)),
+    ("02/29", date(2097, 3, 1), date(2104, 2, 29)),
+    # Accepted by normalize_mmdd, but no year has them
+    ("13/40", date(2026, 10, 17), None),
+    ("04/31", date(2026, 10, 17), None),
+    ("00/10", date(2026, 10, 17), None),
+])
+def test_next_occurrence(mmdd, today, expected):
+    schedule = CompiledSchedule(HOURS, "America/Phoenix", [("02/29", "Closed")])
+    assert schedule.next_occurrence(mmdd, today) == expected
+
+
+def test_leap_day_exception_date():
+    schedule = CompiledSchedule(HOURS, "America/Phoenix", [("02/29", "Closed")])
+    day = schedule.next_occurrence("02/29", date(2026, 10, 17))
+    assert schedule.hours_on(day).text == "Closed"
@@ -0,0 +1,97 @@
+import asyncio
+from contextlib import asynccontextmanager
+import pytest
+from cache import org_schedule_cache
+from routes.vapi_webhook import schedule
+from routes.vapi_webhook.tools import check_date_open, check_open_now  # noqa: F401 (registers the tools)
+from routes.vapi_webhook.tools.registry import TOOL_TIMEOUT_RESULT, run_tool
+
+HOURS = "* Monday: 8:00 AM - 5:00 PM\n* Tuesday: 8:00 AM - 5:00 PM"
+EXCEPTION_DATES = [["12/25", "Closed"]]
+
+
+class FakeCursor:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        # Let the other calls run while this one holds its connection
+        await asyncio.sleep(0)
+
+    async def fetchone(self):
+        # load_org_schedule: hours, time zone and exception dates of the org
+        return (HOURS, "America/Phoenix", EXCEPTION_DATES)
+
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor()
+
+    async def commit(self):
+        pass
+
+
+class SingleConnectionPool:
+    """
+    Stands in for db.pool with max_size=1: callers queue for the one connection, and
+    the most connections any tool call held at once is recorded. A call asking for a
+    second connection while holding one would wait forever on a real pool of one.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._held: dict[asyncio.Task, int] = {}
+        self.checkouts = 0
+        self.max_held_by_one_call = 0
+
+    @asynccontextmanager
+    async def connection(self):
+        task = asyncio.current_task()
+        self._held[task] = self._held.get(task, 0) + 1
+        self.max_held_by_one_call = max(self.max_held_by_one_call, self._held[task])
+        if self._held[task] > 1:
+            self._held[task] -= 1
+            raise AssertionError("tool call asked for a second pooled connection")
+        try:
+            async with self._lock:
+                self.checkouts += 1
+                yield FakeConnection()
+        finally:
+            self._held[task] -= 1
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = SingleConnectionPool()
+    monkeypatch.setattr(schedule, "pool", pool)
+    org_schedule_cache.clear()
+    yield pool
+    org_schedule_cache.clear()
+
+
+@pytest.mark.parametrize("tool_name, arguments", [
+    ("check_date_open", {"date": "12/25"}),
+    ("check_open_now", {}),
+])
+@pytest.mark.parametrize("with_session", [False, True])
+def test_tool_call_holds_at_most_one_pooled_connection(fake_pool, tool_name, arguments, with_session):
+    async def call(i):
+        org_id = f"org-{i}"
+        session = None
+        if with_session:
+            session = {"org_id": org_id, "time_zone": "America/Phoenix"}
+        return await run_tool(tool_name, {**arguments, "org_id": org_id}, session=session)
+
+    async def main():
+        return await asyncio.gather(*(call(i) for i in range(20)))
+
+    results = asyncio.run(main())
+
+    assert fake_pool.max_held_by_one_call == 1
+    # Every call loaded its own org's schedule (distinct orgs, nothing cached)
+    assert fake_pool.checkouts == 20
+    assert TOOL_TIMEOUT_RESULT not in results
+    assert all(not result.startswith("Tool ran") for result in results)
@@ -0,0 +1,79 @@
+import asyncio
+import time
+import pytest
+import usage_metering
+from usage_metering import UsageSpool
+
+
+class FakeAutumn:
+    def __init__(self):
+        self.tracks = []
+        self.fail = False
+
+    async def track(self, **kwargs):
+        self.tracks.append(kwargs)
+        if self.fail:
+            raise ConnectionError("Autumn is unavailable")
+
+
+def event(call_id: str, phone_number: str, minutes: float) -> dict:
+    return {
+        "call_id": call_id,
+        "event_key": call_id,
+        "phone_number": phone_number,
+        "customer_id": None,
+        "minutes": minutes,
+        "created_at": time.time(),
+    }
+
+
+@pytest.fixture
+def metering(tmp_path, monkeypatch):
+    autumn = FakeAutumn()
+    spool = UsageSpool(str(tmp_path / "spool.sqlite3"), "worker-1")
+
+    async def lookup_customers(phone_numbers):
+        return {number: (f"customer{number[-1]}", f"org{number[-1]}") for number in phone_numbers}
+
+    async def ignore(*args):
+        pass
+
+    monkeypatch.setattr(usage_metering, "_spool", spool)
+    monkeypatch.setattr(usage_metering, "get_autumn_client", lambda: autumn)
+    monkeypatch.setattr(usage_metering, "_lookup_customers", lookup_customers)
+    monkeypatch.setattr(usage_metering, "record_usage", ignore)
+    monkeypatch.setattr(usage_metering, "mark_tracked", ignore)
+    yield spool, autumn
+    spool.close()
+
+
+def test_one_track_per_customer(metering):
+    spool, autumn = metering
+    spool.insert([event("a", "+15550001", 2), event("b", "+15550002", 3), event("c", "+15550001", 4)])
+
+    asyncio.run(usage_metering._flush_due_events())
+
+    assert sorted((t["customer_id"], t["value"]) for t in autumn.tracks) == [("customer1", 6), ("customer2", 3)]
+    assert spool.claim_due(time.time(), 10) == []
+
+
+def test_failed_batch_is_retried_with_the_same_events_and_key(metering, monkeypatch):
+    spool, autumn = metering
+    monkeypatch.setattr(usage_metering, "_retry_at", lambda attempts: 0)
+    spool.insert([event("a", "+15550001", 2), event("b", "+15550001", 3)])
+    autumn.fail = True
+    asyncio.run(usage_metering._flush_due_events())
+    failed = autumn.tracks.pop()
+
+    # A new call for the same customer arrives before the retry, and the retry's
+    # claim limit alone would split the failed batch
+    spool.insert([event("c", "+15550001", 4)])
+    monkeypatch.setattr(usage_metering, "MAX_BATCH_SIZE", 1)
+    autumn.fail = False
+    asyncio.run(usage_metering._flush_due_events())
+    asyncio.run(usage_metering._flush_due_events())
+
+    assert [(t["idempotency_key"], t["value"]) for t in autumn.tracks] == [
+        (failed["idempotency_key"], 5),
+        (f"usage:{usage_metering._batch_key([{'event_key': 'c'}])}", 4),
+    ]
@@ -0,0 +1,88 @@
+import os
+import asyncio
+import importlib.util
+from pathlib import Path
+import pytest
+import psycopg
+from psycopg_pool import AsyncConnectionPool
+from migrate import apply_migrations
+
+# Same disposable database as test_query_plans.py; it needs the pg_trgm extension (0004)
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+def load_search_vehicles():
+    # Loaded only when the tests run: importing it pulls in auth, which needs the Supabase env
+    spec = importlib.util.spec_from_file_location(
+        "search_vehicles", Path(__file__).parent.parent / "routes" / "vehicle_routes.py" / "search_vehicles.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+VEHICLES = [
+    # make, model, vin_number, plate_number, owner_first_name, owner_last_name
+    ("Honda", "Civic", "1HGCM82633A004352", "ABC-123", "Maria", "Hernandez"),
+    ("Toyota", "Camry", "4T1BF1FK5CU123456", "XYZ 789", "John", "Smith"),
+    ("Ford", "F-150", "1FTFW1ET5DFC10312", "FRD-150", "Wei", "Nguyen"),
+]
+
+
+@pytest.fixture(scope="module")
+def org_id():
+    with psycopg.connect(TEST_DATABASE_URL, autocommit=True) as conn:
+        available = conn.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'").fetchone()
+        if available is None:
+            pytest.skip("pg_trgm is not available on the test database")
+        apply_migrations(conn)
+        org_id = conn.execute("INSERT INTO orgs (company_name) VALUES ('search test') RETURNING id").fetchone()[0]
+        with conn.cursor() as cur:
+            cur.executemany(
+                """
+                INSERT INTO vehicles (org_id, status, make, model, vin_number, plate_number, owner_first_name, owner_last_name)
+                VALUES (%s, 'on_lot', %s, %s, %s, %s, %s, %s)
+                """,
+                [(org_id, *vehicle) for vehicle in VEHICLES],
+            )
+        try:
+            yield str(org_id)
+        finally:
+            conn.execute("DELETE FROM vehicles WHERE org_id = %s", (org_id,))
+            conn.execute("DELETE FROM orgs WHERE id = %s", (org_id,))
+
+
+def search(org_id: str, q: str, match: str) -> list[str]:
+    """Models of the vehicles GET /vehicles/search returns for q."""
+    async def run():
+        pool = AsyncConnectionPool(TEST_DATABASE_URL, min_size=1, max_size=1, open=False)
+        await pool.open(wait=True)
+        search_vehicles_module = load_search_vehicles()
+        search_vehicles_module.pool = pool
+        try:
+            result = await search_vehicles_module.search_vehicles(
+                q=q, match=match, status=None, year_min=None, year_max=None,
+                location=None, cursor=None, page_size=10, org_id=org_id,
+            )
+        finally:
+            await pool.close()
+        return sorted(vehicle["model"] for vehicle in result["vehicles"])
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("q, match, models", [
+    ("hernand", "substring", ["Civic"]),
+    ("c-12", "substring", ["Civic"]),
+    ("z 78", "substring", ["Camry"]),
+    ("abc1", "prefix", ["Civic"]),
+    ("4t1", "prefix", ["Camry"]),
+    ("toy cam", "prefix", ["Camry"]),
+    ("frd150", "prefix", ["F-150"]),
+    ("john smith", "fulltext", ["Camry"]),
+    ("honda -civic", "fulltext", []),
+    ("ford OR honda", "fulltext", ["Civic", "F-150"]),
+])
+def test_search_modes(org_id, q, match, models):
+    assert search(org_id, q, match) == models
@@ -0,0 +1,394 @@
+# usage_metering.py
+import os
+import time
+import uuid
+import random
+import hashlib
+import socket
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from db import pool
+from autumn_client import get_autumn_client
+from cache import entitlement_cache
+from entitlements import record_usage, mark_tracked
+load_dotenv()
+
+AUTUMN_FEATURE_ID = os.getenv("AUTUMN_FEATURE_ID")
+
+# Local file that holds usage events until Autumn has accepted them
+USAGE_SPOOL_PATH = os.getenv("USAGE_SPOOL_PATH", "usage_spool.sqlite3")
+
+# How often spooled events are sent to Autumn, and how many are sent per pass
+FLUSH_INTERVAL_SECONDS = 5
+MAX_BATCH_SIZE = 500
+MAX_CONCURRENT_TRACKS = 10
+
+# Claimed events are left alone by other workers sharing the spool until the lease
+# runs out; long enough to outlast a slow Autumn request, short enough that a
+# crashed worker's events are picked up again soon.
+CLAIM_LEASE_SECONDS = 300
+
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 3600
+
+
+class UsageSpool:
+    """
+    SQLite-backed list of usage events that haven't been tracked in Autumn yet.
+    Every worker process on the host shares the file, so events are claimed with a
+    lease before they are sent and only the claiming worker may delete or reschedule them.
+    Methods are blocking and are called through asyncio.to_thread.
+    """
+
+    def __init__(self, path: str, worker_id: str):
+        self._worker_id = worker_id
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS usage_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                call_id TEXT UNIQUE,
+                phone_number TEXT,
+                customer_id TEXT,
+                minutes REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            )
+        """)
+        # Spools written before claims and event keys existed get the new columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(usage_events)")}
+        if "event_key" not in columns:
+            self._conn.execute("ALTER TABLE usage_events ADD COLUMN event_key TEXT")
+            self._conn.execute("UPDATE usage_events SET event_key = coalesce(call_id, 'spool-' || id)")
+        if "claimed_by" not in columns:
+            self._conn.execute("ALTER TABLE usage_events ADD COLUMN claimed_by TEXT")
+        if "lease_until" not in columns:
+            self._conn.execute("ALTER TABLE usage_events ADD COLUMN lease_until REAL NOT NULL DEFAULT 0")
+        if "batch_key" not in columns:
+            self._conn.execute("ALTER TABLE usage_events ADD COLUMN batch_key TEXT")
+        self._conn.commit()
+
+    def insert(self, events: list[dict]) -> None:
+        # call_id is unique, so a report Vapi delivers twice is only billed once
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT OR IGNORE INTO usage_events (call_id, event_key, phone_number, customer_id, minutes, created_at)
+                VALUES (:call_id, :event_key, :phone_number, :customer_id, :minutes, :created_at)
+                """,
+                events,
+            )
+            self._conn.commit()
+
+    def claim_due(self, now: float, limit: int) -> list[dict]:
+        """
+        Lease up to limit due events to this worker. The select and the claim are one
+        statement, so two workers polling at once never get the same event. Events of a
+        batch that was already sent are always claimed together, even past the limit,
+        so the batch is retried exactly as it was sent.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                """
+                UPDATE usage_events
+                SET claimed_by = ?, lease_until = ?
+                WHERE id IN (
+                    SELECT id FROM usage_events
+                    WHERE next_attempt_at <= ? AND lease_until <= ?
+                    ORDER BY id
+                    LIMIT ?
+                )
+                RETURNING id, call_id, event_key, phone_number, customer_id, minutes, attempts, batch_key
+                """,
+                (self._worker_id, now + CLAIM_LEASE_SECONDS, now, now, limit),
+            )
+            column_names = [desc[0] for desc in cur.description]
+            rows = [dict(zip(column_names, row)) for row in cur.fetchall()]
+
+            # Same write transaction as the claim above, so no other worker can take the rest
+            batch_keys = sorted({row["batch_key"] for row in rows if row["batch_key"]})
+            if batch_keys:
+                cur = self._conn.execute(
+                    f"""
+                    UPDATE usage_events
+                    SET claimed_by = ?, lease_until = ?
+                    WHERE batch_key IN ({', '.join('?' * len(batch_keys))}) AND lease_until <= ?
+                    RETURNING id, call_id, event_key, phone_number, customer_id, minutes, attempts, batch_key
+                    """,
+                    (self._worker_id, now + CLAIM_LEASE_SECONDS, *batch_keys, now),
+                )
+                rows += [dict(zip(column_names, row)) for row in cur.fetchall()]
+            self._conn.commit()
+            return sorted(rows, key=lambda row: row["id"])
+
+    def set_customer_ids(self, customer_ids: dict[int, str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE usage_events SET customer_id = ? WHERE id = ? AND claimed_by = ?",
+                [(customer_id, event_id, self._worker_id) for event_id, customer_id in customer_ids.items()],
+            )
+            self._conn.commit()
+
+    def set_batch_keys(self, batch_keys: dict[int, str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE usage_events SET batch_key = ? WHERE id = ? AND claimed_by = ?",
+                [(batch_key, event_id, self._worker_id) for event_id, batch_key in batch_keys.items()],
+            )
+            self._conn.commit()
+
+    def delete(self, ids: list[int]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM usage_events WHERE id = ? AND claimed_by = ?",
+                [(i, self._worker_id) for i in ids],
+            )
+            self._conn.commit()
+
+    def reschedule(self, ids: list[int], attempts: int, next_attempt_at: float) -> None:
+        # Releases the claim so whichever worker polls after next_attempt_at can retry it
+        with self._lock:
+            self._conn.executemany(
+                """
+                UPDATE usage_events
+                SET attempts = ?, next_attempt_at = ?, claimed_by = NULL, lease_until = 0
+                WHERE id = ? AND claimed_by = ?
+                """,
+                [(attempts, next_attempt_at, i, self._worker_id) for i in ids],
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_queue: asyncio.Queue = asyncio.Queue()
+_spool: UsageSpool | None = None
+_worker_task: asyncio.Task | None = None
+
+# Identifies this process's claims in the shared spool
+_worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def enqueue_usage(call_id: str | None, phone_number: str | None, minutes: float) -> None:
+    """
+    Record a finished call's billable minutes. Returns immediately; the worker
+    spools the event to disk and tracks it in Autumn in the background.
+    """
+    _queue.put_nowait({
+        "call_id": call_id,
+        # Autumn idempotency key for this event, fixed for as long as it is spooled
+        "event_key": call_id or f"event-{uuid.uuid4()}",
+        "phone_number": phone_number,
+        "customer_id": None,
+        "minutes": minutes,
+        "created_at": time.time(),
+    })
+
+
+def _drain_queue() -> list[dict]:
+    events = []
+    while True:
+        try:
+            events.append(_queue.get_nowait())
+        except asyncio.QueueEmpty:
+            return events
+
+
+async def _lookup_customers(phone_numbers: set[str]) -> dict[str, tuple[str, str]]:
+    """
+    Map lot phone numbers to (Autumn customer id, org_id). The customer is the org's
+    first profile, the same one the entitlement reconciler checks.
+    """
+    if not phone_numbers:
+        return {}
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("""
+                SELECT DISTINCT ON (orgs.phone_number) orgs.phone_number, profiles.id, orgs.id
+                FROM profiles
+                INNER JOIN orgs ON profiles.org_id = orgs.id
+                WHERE orgs.phone_number = ANY(%s)
+                ORDER BY orgs.phone_number, profiles.created_at, profiles.id
+            """, (list(phone_numbers),))
+            rows = await cur.fetchall()
+    return {phone_number: (str(customer_id), str(org_id)) for phone_number, customer_id, org_id in rows}
+
+
+def _retry_at(attempts: int) -> float:
+    delay = min(RETRY_BASE_SECONDS * 2 ** attempts, RETRY_MAX_SECONDS)
+    # Jitter so a recovering Autumn isn't hit by every worker at once
+    return time.time() + delay * random.uniform(0.5, 1.5)
+
+
+async def _flush_due_events() -> None:
+    events = await asyncio.to_thread(_spool.claim_due, time.time(), MAX_BATCH_SIZE)
+    if not events:
+        return
+
+    unresolved = {e["phone_number"] for e in events if not e["customer_id"] and e["phone_number"]}
+    if unresolved:
+        try:
+            customers = await _lookup_customers(unresolved)
+        except Exception as e:
+            print(f"Error fetching customer_id from phone_number: {e}")
+            customers = {}
+        resolved = {}
+        ledger_entries = []
+        for event in events:
+            if not event["customer_id"] and event["phone_number"] in customers:
+                customer_id, org_id = customers[event["phone_number"]]
+                event["customer_id"] = customer_id
+                resolved[event["id"]] = customer_id
+                if event["call_id"]:
+                    ledger_entries.append((event["call_id"], org_id, customer_id, event["minutes"]))
+        if resolved:
+            # The ledger lets the call gate count these minutes before Autumn has them.
+            # If it can't be written, Autumn's balance catches up at the next entitlement sync.
+            try:
+                await record_usage(ledger_entries)
+            except Exception as e:
+                print(f"Error recording usage in the ledger: {e}")
+            await asyncio.to_thread(_spool.set_customer_ids, resolved)
+
+    trackable = []
+    for event in events:
+        if event["customer_id"]:
+            trackable.append(event)
+        elif not event["phone_number"]:
+            print(f"Dropping usage event without a phone number: call_id={event['call_id']}")
+            await asyncio.to_thread(_spool.delete, [event["id"]])
+        else:
+            # Org lookup failed or the number isn't assigned yet; try again later
+            await asyncio.to_thread(_spool.reschedule, [event["id"]], event["attempts"] + 1, _retry_at(event["attempts"]))
+
+    batches = await _batch_by_customer(trackable)
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TRACKS)
+
+    async def track_one(batch: list[dict]) -> None:
+        async with semaphore:
+            await _track_batch(batch)
+
+    await asyncio.gather(*(track_one(batch) for batch in batches))
+
+
+def _batch_key(events: list[dict]) -> str:
+    """Deterministic key for a set of events: the same events always get the same key."""
+    event_keys = "\n".join(sorted(event["event_key"] for event in events))
+    return hashlib.sha256(event_keys.encode()).hexdigest()
+
+
+async def _batch_by_customer(events: list[dict]) -> list[list[dict]]:
+    """
+    Group events into one Autumn track per batch. Events that were already sent keep
+    their batch; new events are grouped per customer and their batch key is spooled
+    before anything is sent, so a retry sends the same events under the same key.
+    """
+    batches: dict[str, list[dict]] = {}
+    new_batches: dict[str, list[dict]] = {}
+    for event in events:
+        if event["batch_key"]:
+            batches.setdefault(event["batch_key"], []).append(event)
+        else:
+            new_batches.setdefault(event["customer_id"], []).append(event)
+
+    assigned = {}
+    for customer_events in new_batches.values():
+        batch_key = _batch_key(customer_events)
+        for event in customer_events:
+            event["batch_key"] = batch_key
+            assigned[event["id"]] = batch_key
+        batches[batch_key] = customer_events
+    if assigned:
+        await asyncio.to_thread(_spool.set_batch_keys, assigned)
+
+    return list(batches.values())
+
+
+async def _track_batch(events: list[dict]) -> None:
+    """
+    Track one customer's batch of events in Autumn as a single usage record.
+    The idempotency key is the batch key, which stays fixed across retries and workers
+    (see _batch_by_customer), so Autumn counts the batch once.
+    """
+    customer_id = events[0]["customer_id"]
+    ids = [event["id"] for event in events]
+    call_ids = [event["call_id"] for event in events if event["call_id"]]
+    # Taken before the request, so a sync that starts after Autumn applies it never counts it twice
+    tracked_at = datetime.now(timezone.utc)
+    try:
+        await get_autumn_client().track(
+            customer_id=customer_id,
+            feature_id=AUTUMN_FEATURE_ID,
+            value=sum(event["minutes"] for event in events),
+            idempotency_key=f"usage:{events[0]['batch_key']}",
+        )
+    except Exception as e:
+        attempts = max(event["attempts"] for event in events) + 1
+        print(f"Error tracking usage for customer {customer_id}, retry #{attempts}: {e}")
+        await asyncio.to_thread(_spool.reschedule, ids, attempts, _retry_at(attempts - 1))
+        return
+    # Balance changed, so the dashboard's next check goes to Autumn
+    entitlement_cache.pop(customer_id)
+    try:
+        await mark_tracked(call_ids, tracked_at)
+    except Exception as e:
+        print(f"Error marking usage as tracked for customer {customer_id}: {e}")
+    await asyncio.to_thread(_spool.delete, ids)
+
+
+async def _run_worker() -> None:
+    last_flush = 0.0
+    while True:
+        try:
+            try:
+                first = await asyncio.wait_for(_queue.get(), timeout=FLUSH_INTERVAL_SECONDS)
+                events = [first] + _drain_queue()
+            except asyncio.TimeoutError:
+                events = []
+
+            # Persist first so a restart can't lose billable minutes
+            if events:
+                await asyncio.to_thread(_spool.insert, events)
+
+            if time.monotonic() - last_flush >= FLUSH_INTERVAL_SECONDS:
+                last_flush = time.monotonic()
+                await _flush_due_events()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Usage metering worker error: {e}")
+
+
+def start_usage_metering() -> None:
+    """Open the spool and start the background worker (called from the app lifespan)."""
+    global _spool, _worker_task
+    if _spool is None:
+        _spool = UsageSpool(USAGE_SPOOL_PATH, _worker_id)
+    if _worker_task is None or _worker_task.done():
+        _worker_task = asyncio.create_task(_run_worker())
+
+
+async def stop_usage_metering() -> None:
+    """Stop the worker and spool anything still queued in memory."""
+    global _spool, _worker_task
+    if _worker_task is not None:
+        _worker_task.cancel()
+        try:
+            await _worker_task
+        except asyncio.CancelledError:
+            pass
+        _worker_task = None
+    if _spool is not None:
+        events = _drain_queue()
+        if events:
+            await asyncio.to_thread(_spool.insert, events)
+        _spool.close()
+        _spool = None
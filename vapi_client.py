@@ -0,0 +1,101 @@
+# vapi_client.py
+import os
+import random
+import asyncio
+import httpx
+from fastapi import HTTPException
+from dotenv import load_dotenv
+load_dotenv()
+
+VAPI_API_KEY = os.getenv("VAPI_API_KEY")
+if not VAPI_API_KEY:
+    raise RuntimeError("VAPI_API_KEY is not set in .env")
+
+VAPI_BASE_URL = "https://api.vapi.ai"
+
+CONNECT_TIMEOUT_SECONDS = 5.0
+READ_TIMEOUT_SECONDS = 30.0
+
+MAX_RETRIES = 3
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Safe to repeat even if Vapi already acted on the first attempt
+IDEMPOTENT_METHODS = {"GET", "PUT", "PATCH", "DELETE"}
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_vapi_client() -> httpx.AsyncClient:
+    """
+    The app-wide Vapi client: keep-alive connections over HTTP/2, so consecutive
+    calls (e.g. GET, POST, DELETE when changing area code) reuse one TLS session.
+    Created on first use and closed by close_vapi_client at shutdown.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=VAPI_BASE_URL,
+            http2=True,
+            timeout=httpx.Timeout(READ_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+            headers={
+                "Authorization": f"Bearer {VAPI_API_KEY}",
+                "Content-Type": "application/json",
+            },
+        )
+    return _client
+
+
+async def close_vapi_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    if response is not None and response.status_code == 429:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), RETRY_MAX_SECONDS)
+    delay = min(RETRY_BASE_SECONDS * 2 ** attempt, RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.5)
+
+
+async def vapi_request(method: str, path: str, *, json: dict | None = None) -> httpx.Response:
+    """
+    Send a request to the Vapi API and return the response, whatever its status.
+    429 and 5xx responses and connection failures are retried with jittered backoff.
+    Non-idempotent requests (POST) are only retried when Vapi can't have acted on them:
+    a 429 or a failure to connect. Raises HTTPException(502) if Vapi can't be reached.
+    """
+    method = method.upper()
+    client = get_vapi_client()
+
+    for attempt in range(MAX_RETRIES + 1):
+        response = None
+        try:
+            response = await client.request(method, path, json=json)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            error = e
+        except httpx.TransportError as e:
+            if method not in IDEMPOTENT_METHODS:
+                raise HTTPException(
+                    status_code=502,
+                    detail={"error": f"Vapi request failed: {e!r}"},
+                )
+            error = e
+        else:
+            retryable = response.status_code == 429 or (
+                response.status_code in RETRY_STATUSES and method in IDEMPOTENT_METHODS
+            )
+            if not retryable or attempt == MAX_RETRIES:
+                return response
+
+        if attempt == MAX_RETRIES:
+            raise HTTPException(
+                status_code=502,
+                detail={"error": f"Could not reach Vapi: {error!r}"},
+            )
+        await asyncio.sleep(_retry_delay(attempt, response))